@@ -6,11 +6,48 @@ Latest: 18-JUL-2025
 """
 
 
+import os
+
+import orjson
 from flask import Flask, render_template, Response
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+from data.data_models import db
 
 app = Flask(__name__)
 
 
+# -----------------------------------------------------
+# Database
+# -----------------------------------------------------
+
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///ebita.sqlite')
+
+database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+# In-memory SQLite lives in a single connection (Flask-SQLAlchemy gives it a StaticPool), so it takes no pool sizing
+in_memory_sqlite = (database_url.get_backend_name() == 'sqlite'
+                    and (database_url.database in (None, '', ':memory:') or database_url.query.get('mode') == 'memory'))
+
+if in_memory_sqlite:
+    engine_options = {}
+# Serverless / short-lived processes should not hold on to pooled connections
+elif os.getenv('EBITA_ENV') == 'serverless':
+    engine_options = {"poolclass": NullPool}
+else:
+    engine_options = {"pool_size": 10, "max_overflow": 20, "pool_pre_ping": True, "pool_recycle": 1800}
+
+# JSON columns are (de)serialized with orjson instead of the stdlib json module
+engine_options["json_serializer"] = lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+engine_options["json_deserializer"] = orjson.loads
+
+if database_url.get_backend_name() == 'sqlite':
+    engine_options["connect_args"] = {"check_same_thread": False, "timeout": 30}
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+db.init_app(app)
+
+
 # -----------------------------------------------------
 # Status
 # -----------------------------------------------------
@@ -102,7 +139,10 @@ def internal_server_error(e) -> Response:
 
 
 if __name__ == '__main__':
-    with app.app_context():
-        data.data_models.db.create_all()
+    # Schema creation is opt-in so regular starts skip the introspection round trip
+    if os.getenv('EBITA_CREATE_DB') == '1':
+        with app.app_context():
+            db.create_all()
 
-    app.run(debug=True)
+    # Development server only; production runs under gunicorn (see wsgi.py)
+    app.run(debug=os.getenv('FLASK_DEBUG') == '1')
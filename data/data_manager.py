@@ -4,8 +4,86 @@ This module provides methods for interacting with the database
 using Flask-SQLAlchemy models.
 """
 
-from .data_models import db, User, Company, EarningsCallTranscript, AnalysisReport, UserWatchlist
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from .data_models import db, password_hasher, User, Company, EarningsCallTranscript, AnalysisReport, UserWatchlist
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+from dogpile.cache import make_region
+from sqlalchemy import bindparam, column, delete, exists, func, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer, joinedload, load_only
+
+# Read-through cache for near-static lookups. The pickling backend hands out
+# detached copies, which DataManager merges into the current session.
+cache_region = make_region().configure("dogpile.cache.memory_pickle", expiration_time=300)
+
+# List queries skip the bulky text/JSON payloads; only the single-row getters load them
+TRANSCRIPT_HEADER_COLUMNS = (
+    EarningsCallTranscript.transcript_id, EarningsCallTranscript.ticker_symbol,
+    EarningsCallTranscript.fiscal_year, EarningsCallTranscript.fiscal_quarter,
+    EarningsCallTranscript.call_date, EarningsCallTranscript.source_url,
+)
+REPORT_LIST_DEFERRED = (
+    defer(AnalysisReport.gemini_raw_response_json), defer(AnalysisReport.chatgpt_raw_response_json),
+    defer(AnalysisReport.gemini_sentiment_scores_by_segment), defer(AnalysisReport.chatgpt_sentiment_scores_by_segment),
+)
+
+# Statements for the hottest lookups, built once so every call hits SQLAlchemy's compiled cache
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+USER_ID_BY_USERNAME = select(User.user_id).where(User.username == bindparam("username"))
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+EMAIL_EXISTS = select(exists().where(User.email == bindparam("email")))
+WATCHLIST_ITEM_EXISTS = select(exists().where(UserWatchlist.user_id == bindparam("user_id"),
+                                              UserWatchlist.ticker_symbol == bindparam("ticker_symbol")))
+
+def _fts_prefix_query(search_query):
+    """
+    Turns free text into an FTS5 query matching every word as a prefix,
+    e.g. 'micro corp' -> '"micro"* "corp"*'. Quoting keeps punctuation from being read as FTS syntax.
+    """
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in search_query.split())
+
+def _column_default(column):
+    """Returns the value a column's Python-side default would insert (None if it has none)."""
+    default = column.default
+    if default is None or not (default.is_scalar or default.is_callable):
+        return None
+    return default.arg(None) if default.is_callable else default.arg
+
+# Misses are not cached: the region is per process, so another worker adding the company could not invalidate them
+@cache_region.cache_on_arguments(should_cache_fn=lambda company: company is not None)
+def _load_company_by_ticker(ticker_symbol):
+    return db.session.get(Company, ticker_symbol)
+
+# Only the username -> user_id mapping is cached: the cache is per process, so caching whole rows
+# would keep serving a stale is_active or password_hash on the other workers after an update
+@cache_region.cache_on_arguments(should_cache_fn=lambda user_id: user_id is not None)
+def _load_user_id_by_username(username):
+    return db.session.execute(USER_ID_BY_USERNAME, {"username": username}).scalar_one_or_none()
+
+# Short-lived memory of user lookups that found nobody, so repeated misses
+# (e.g., brute-force logins against unknown usernames) skip the database
+_missing_users = TTLCache(maxsize=10_000, ttl=60)
+_missing_users_lock = threading.Lock()
+
+def _is_known_missing(key):
+    with _missing_users_lock:
+        return key in _missing_users
+
+def _remember_missing(key):
+    with _missing_users_lock:
+        _missing_users[key] = True
+
+def _forget_missing(*keys):
+    with _missing_users_lock:
+        for key in keys:
+            _missing_users.pop(key, None)
 
 class DataManager:
     """
@@ -13,12 +91,51 @@ class DataManager:
     Encapsulates CRUD operations for users, companies, transcripts,
     analysis reports, and watchlists.
     """
+    UPDATABLE_PROFILE_FIELDS = frozenset({"email", "is_active", "last_login_at"})
+
     def __init__(self, app_db):
         """
         Initializes the DataManager with the SQLAlchemy db object.
         """
         self.db = app_db
 
+    def _merge_cached(self, instance):
+        """Attaches an instance served from the cache to the current session, without a SELECT."""
+        if instance is None:
+            return None
+        return self.db.session.merge(instance, load=False)
+
+    def _insert_ignoring_duplicates(self, model, rows, index_elements, batch_size):
+        """
+        Inserts rows (dicts) in batches, silently skipping those that hit the given unique columns.
+        All batches go through a single transaction.
+        Returns the number of rows inserted.
+        """
+        if self.db.engine.dialect.name == "postgresql":
+            insert = postgresql_insert
+        else:
+            insert = sqlite_insert
+        statement = insert(model.__table__).on_conflict_do_nothing(index_elements=index_elements)
+        rows = self._uniform_rows(model.__table__, rows)
+
+        connection = self.db.session.connection()
+        inserted = 0
+        for start in range(0, len(rows), batch_size):
+            result = connection.execute(statement, rows[start:start + batch_size])
+            inserted += result.rowcount
+        self.db.session.commit()
+        return inserted
+
+    @staticmethod
+    def _uniform_rows(table, rows):
+        """
+        Gives every row the same columns (all those any row sets), as executemany compiles the
+        statement for the first row's keys. Missing values take the column's Python-side default, else None.
+        """
+        names = [name for name in table.columns.keys() if any(name in row for row in rows)]
+        fillers = {name: _column_default(table.columns[name]) for name in names}
+        return [{name: row[name] if name in row else fillers[name] for name in names} for row in rows]
+
     # --- User Management ---
     def create_user(self, username, email, password):
         """
@@ -30,6 +147,7 @@ class DataManager:
             new_user.set_password(password)
             self.db.session.add(new_user)
             self.db.session.commit()
+            _forget_missing(hashkey("username", username), hashkey("email", email))
             return new_user
         except IntegrityError:
             self.db.session.rollback()
@@ -39,22 +157,93 @@ class DataManager:
             print(f"Error creating user: {e}")
             return None
 
+    def create_users_bulk(self, records):
+        """
+        Creates many users at once (e.g., for an import script).
+        Each record is a dict with 'username', 'email' and 'password'. Passwords are hashed
+        on a thread pool (argon2 releases the GIL) and all users are inserted in one transaction.
+        Returns the number of users created, None on error (e.g., a username/email already exists).
+        """
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            password_hashes = list(executor.map(password_hasher.hash, (record["password"] for record in records)))
+
+        mappings = [
+            {"username": record["username"], "email": record["email"], "password_hash": password_hash}
+            for record, password_hash in zip(records, password_hashes)
+        ]
+        try:
+            self.db.session.bulk_insert_mappings(User, mappings)
+            self.db.session.commit()
+        except IntegrityError:
+            self.db.session.rollback()
+            return None # A user/email already exists
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Error creating users in bulk: {e}")
+            return None
+        _forget_missing(*(hashkey(field, record[field]) for record in records for field in ("username", "email")))
+        return len(mappings)
+
     def get_user_by_id(self, user_id):
         """Retrieves a user by their ID."""
-        return User.query.get(user_id)
+        return self.db.session.get(User, user_id)
 
     def get_user_by_username(self, username):
-        """Retrieves a user by their username."""
-        return User.query.filter_by(username=username).first()
+        """
+        Retrieves a user by their username. The user_id comes from the cache when possible,
+        the row itself always from the database (a primary-key lookup).
+        """
+        key = hashkey("username", username)
+        if _is_known_missing(key):
+            return None
+        user_id = _load_user_id_by_username(username)
+        user = self.db.session.get(User, user_id) if user_id is not None else None
+        if user_id is not None and (user is None or user.username != username):
+            # Deleted (and maybe its id reused) by another process since it was cached
+            _load_user_id_by_username.invalidate(username)
+            user = self.db.session.execute(USER_BY_USERNAME, {"username": username}).scalar_one_or_none()
+        if user is None:
+            _remember_missing(key)
+        return user
+
+    def authenticate_user(self, username, password):
+        """
+        Checks a username/password pair, saving the upgraded hash when check_password re-hashed it.
+        Returns the User object on success, None otherwise.
+        """
+        user = self.get_user_by_username(username)
+        if user is None:
+            return None
+        previous_hash = user.password_hash
+        if not user.check_password(password):
+            return None
+        if user.password_hash != previous_hash:
+            try:
+                self.db.session.commit()
+            except Exception as e:
+                self.db.session.rollback()
+                print(f"Error saving re-hashed password: {e}")
+            _load_user_id_by_username.invalidate(username)
+        return user
 
     def get_user_by_email(self, email):
         """Retrieves a user by their email address."""
-        return User.query.filter_by(email=email).first()
+        key = hashkey("email", email)
+        if _is_known_missing(key):
+            return None
+        user = self.db.session.execute(USER_BY_EMAIL, {"email": email}).scalar_one_or_none()
+        if user is None:
+            _remember_missing(key)
+        return user
+
+    def is_email_registered(self, email):
+        """Checks if an email address already belongs to a user (e.g., for registration validation)."""
+        return self.db.session.execute(EMAIL_EXISTS, {"email": email}).scalar()
 
     def update_user_profile(self, user_id, **kwargs):
         """
         Updates a user's profile information.
-        Kwargs can include: email, is_active, last_login_at.
+        Kwargs can include: email, is_active, last_login_at (anything else is ignored).
         Returns the updated User object on success, None if user not found or on error.
         """
         user = self.get_user_by_id(user_id)
@@ -62,9 +251,12 @@ class DataManager:
             return None
         try:
             for key, value in kwargs.items():
-                if hasattr(user, key):
+                if key in self.UPDATABLE_PROFILE_FIELDS:
                     setattr(user, key, value)
             self.db.session.commit()
+            _load_user_id_by_username.invalidate(user.username)
+            if "email" in kwargs:
+                _forget_missing(hashkey("email", kwargs["email"]))
             return user
         except IntegrityError:
             self.db.session.rollback()
@@ -74,13 +266,33 @@ class DataManager:
             print(f"Error updating user profile: {e}")
             return None
 
+    def _set_user_active(self, user_id, is_active):
+        """
+        Flips a user's active flag with a single UPDATE, without loading the user first.
+        Returns True on success, False if user not found or on error.
+        """
+        try:
+            result = self.db.session.execute(
+                update(User).where(User.user_id == user_id).values(is_active=is_active).returning(User.username)
+            )
+            username = result.scalar_one_or_none()
+            self.db.session.commit()
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Error updating user active flag: {e}")
+            return False
+        if username is None:
+            return False
+        _load_user_id_by_username.invalidate(username)
+        return True
+
     def deactivate_user(self, user_id):
-        """Deactivates a user account."""
-        return self.update_user_profile(user_id, is_active=False)
+        """Deactivates a user account. Returns True on success, False otherwise."""
+        return self._set_user_active(user_id, False)
 
     def activate_user(self, user_id):
-        """Activates a user account."""
-        return self.update_user_profile(user_id, is_active=True)
+        """Activates a user account. Returns True on success, False otherwise."""
+        return self._set_user_active(user_id, True)
 
     def delete_user(self, user_id):
         """
@@ -93,6 +305,7 @@ class DataManager:
         try:
             self.db.session.delete(user)
             self.db.session.commit()
+            _load_user_id_by_username.invalidate(user.username)
             return True
         except Exception as e:
             self.db.session.rollback()
@@ -116,6 +329,7 @@ class DataManager:
             )
             self.db.session.add(new_company)
             self.db.session.commit()
+            _load_company_by_ticker.invalidate(ticker_symbol)
             return new_company
         except IntegrityError:
             self.db.session.rollback()
@@ -125,26 +339,59 @@ class DataManager:
             print(f"Error adding company: {e}")
             return None
 
+    def add_companies_bulk(self, rows, batch_size=500):
+        """
+        Adds many companies at once, for ingestion jobs.
+        Each row is a dict of Company columns; tickers that already exist are skipped.
+        Returns the number of companies added, None on error.
+        """
+        try:
+            inserted = self._insert_ignoring_duplicates(Company, rows, ["ticker_symbol"], batch_size)
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Error adding companies in bulk: {e}")
+            return None
+        for row in rows:
+            _load_company_by_ticker.invalidate(row["ticker_symbol"])
+        return inserted
+
     def get_company_by_ticker(self, ticker_symbol):
-        """Retrieves a company by its ticker symbol."""
-        return Company.query.get(ticker_symbol)
+        """Retrieves a company by its ticker symbol, served from the cache when possible."""
+        return self._merge_cached(_load_company_by_ticker(ticker_symbol))
 
-    def get_all_companies(self, search_query=None, industry=None, sector=None, limit=None, offset=None):
+    def get_all_companies(self, search_query=None, industry=None, sector=None, limit=None, offset=None, *, after=None):
         """
-        Retrieves all companies, with optional search and filtering.
+        Retrieves all companies ordered by ticker symbol, with optional search and filtering.
+        Paginates by keyset: pass the ticker symbol of the last company of a page as 'after'.
+        'offset' still works but is deprecated, as the database has to skip every earlier row.
+        On SQLite the search goes through the companies_fts index, matching words of the
+        ticker, name, industry or sector by prefix; other databases match the start of the
+        ticker or name, through the lower(company_name) index.
         """
         query = Company.query
-        if search_query:
-            query = query.filter(Company.company_name.ilike(f'%{search_query}%') |
-                                 Company.ticker_symbol.ilike(f'%{search_query}%'))
+        if search_query and search_query.strip():
+            if self.db.engine.dialect.name == "sqlite":
+                matching_tickers = text(
+                    "SELECT ticker_symbol FROM companies_fts WHERE companies_fts MATCH :fts_query"
+                ).bindparams(fts_query=_fts_prefix_query(search_query)).columns(column("ticker_symbol"))
+                query = query.filter(Company.ticker_symbol.in_(matching_tickers))
+            else:
+                prefix = search_query.strip()
+                query = query.filter(func.lower(Company.company_name).startswith(prefix.lower(), autoescape=True) |
+                                     Company.ticker_symbol.startswith(prefix.upper(), autoescape=True))
         if industry:
             query = query.filter_by(industry=industry)
         if sector:
             query = query.filter_by(sector=sector)
+        if after is not None:
+            query = query.filter(Company.ticker_symbol > after)
 
+        query = query.order_by(Company.ticker_symbol)
         if limit is not None:
             query = query.limit(limit)
         if offset is not None:
+            warnings.warn("get_all_companies(offset=...) is deprecated; paginate with after=<last ticker_symbol>",
+                          DeprecationWarning, stacklevel=2)
             query = query.offset(offset)
 
         return query.all()
@@ -176,13 +423,31 @@ class DataManager:
             print(f"Error adding transcript: {e}")
             return None
 
+    def add_transcripts_bulk(self, rows, batch_size=500):
+        """
+        Adds many earnings call transcripts at once, for ingestion jobs (e.g., backfills).
+        Each row is a dict of EarningsCallTranscript columns; transcripts already stored
+        for the same company/year/quarter are skipped.
+        Returns the number of transcripts added, None on error.
+        """
+        try:
+            return self._insert_ignoring_duplicates(
+                EarningsCallTranscript, rows, ["ticker_symbol", "fiscal_year", "fiscal_quarter"], batch_size
+            )
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Error adding transcripts in bulk: {e}")
+            return None
+
     def get_transcript_by_id(self, transcript_id):
         """Retrieves an earnings call transcript by its ID."""
-        return EarningsCallTranscript.query.get(transcript_id)
+        return self.db.session.get(EarningsCallTranscript, transcript_id)
 
     def get_transcripts_for_company(self, ticker_symbol):
-        """Retrieves all transcripts for a given company."""
-        return EarningsCallTranscript.query.filter_by(ticker_symbol=ticker_symbol).order_by(
+        """Retrieves all transcripts for a given company, without their text (see get_transcript_by_id)."""
+        return EarningsCallTranscript.query.options(
+            load_only(*TRANSCRIPT_HEADER_COLUMNS)
+        ).filter_by(ticker_symbol=ticker_symbol).order_by(
             EarningsCallTranscript.fiscal_year.desc(),
             EarningsCallTranscript.fiscal_quarter.desc()
         ).all()
@@ -249,15 +514,40 @@ class DataManager:
 
     def get_report_by_id(self, report_id):
         """Retrieves an analysis report by its ID."""
-        return AnalysisReport.query.get(report_id)
+        return self.db.session.get(AnalysisReport, report_id)
+
+    def _paginate_reports(self, query, after, limit):
+        """
+        Orders a report query newest first and applies keyset pagination.
+        'after' is the (analysis_date, report_id) of the last report of the previous page.
+        """
+        if after is not None:
+            query = query.filter(tuple_(AnalysisReport.analysis_date, AnalysisReport.report_id) < tuple(after))
+        query = query.order_by(AnalysisReport.analysis_date.desc(), AnalysisReport.report_id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
 
-    def get_reports_for_user(self, user_id):
-        """Retrieves all analysis reports for a specific user."""
-        return AnalysisReport.query.filter_by(user_id=user_id).order_by(AnalysisReport.analysis_date.desc()).all()
+    def get_reports_for_user(self, user_id, after=None, limit=None):
+        """
+        Retrieves the analysis reports for a specific user, newest first (all of them unless a limit is given).
+        The transcript and its company are loaded in the same query, as the dashboard lists both.
+        Pass (analysis_date, report_id) of the last report as 'after' to get the next page.
+        """
+        query = AnalysisReport.query.options(
+            *REPORT_LIST_DEFERRED,
+            joinedload(AnalysisReport.transcript, innerjoin=True).load_only(*TRANSCRIPT_HEADER_COLUMNS),
+            joinedload(AnalysisReport.transcript, innerjoin=True).joinedload(EarningsCallTranscript.company, innerjoin=True)
+        ).filter_by(user_id=user_id)
+        return self._paginate_reports(query, after, limit)
 
-    def get_reports_for_transcript(self, transcript_id):
-        """Retrieves all analysis reports for a specific transcript."""
-        return AnalysisReport.query.filter_by(transcript_id=transcript_id).order_by(AnalysisReport.analysis_date.desc()).all()
+    def get_reports_for_transcript(self, transcript_id, after=None, limit=None):
+        """
+        Retrieves the analysis reports for a specific transcript, newest first (all of them unless a limit is given).
+        Pass (analysis_date, report_id) of the last report as 'after' to get the next page.
+        """
+        query = AnalysisReport.query.options(*REPORT_LIST_DEFERRED).filter_by(transcript_id=transcript_id)
+        return self._paginate_reports(query, after, limit)
 
     def get_latest_report_for_user_and_transcript(self, user_id, transcript_id):
         """Retrieves the latest analysis report for a given user and transcript."""
@@ -290,22 +580,26 @@ class DataManager:
         Removes a stock from a user's watchlist.
         Returns True on success, False if not found or on error.
         """
-        item = UserWatchlist.query.filter_by(user_id=user_id, ticker_symbol=ticker_symbol).first()
-        if not item:
-            return False
         try:
-            self.db.session.delete(item)
+            result = self.db.session.execute(
+                delete(UserWatchlist).where(UserWatchlist.user_id == user_id,
+                                            UserWatchlist.ticker_symbol == ticker_symbol)
+            )
             self.db.session.commit()
-            return True
+            return result.rowcount > 0
         except Exception as e:
             self.db.session.rollback()
             print(f"Error removing stock from watchlist: {e}")
             return False
 
     def get_user_watchlist(self, user_id):
-        """Retrieves all stocks in a user's watchlist."""
-        return UserWatchlist.query.filter_by(user_id=user_id).join(Company).all()
+        """Retrieves all stocks in a user's watchlist, with their companies loaded in the same query."""
+        return UserWatchlist.query.options(
+            joinedload(UserWatchlist.company, innerjoin=True)
+        ).filter_by(user_id=user_id).all()
 
     def is_stock_in_watchlist(self, user_id, ticker_symbol):
         """Checks if a specific stock is in a user's watchlist."""
-        return UserWatchlist.query.filter_by(user_id=user_id, ticker_symbol=ticker_symbol).first() is not None
+        return self.db.session.execute(
+            WATCHLIST_ITEM_EXISTS, {"user_id": user_id, "ticker_symbol": ticker_symbol}
+        ).scalar()
@@ -3,17 +3,85 @@ Module containing all data models of the app.
 Designed for SQLite using Flask-SQLAlchemy.
 """
 
+import sqlite3
+
+import orjson
+import zstandard as zstd
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import UniqueConstraint
-from datetime import datetime
+from sqlalchemy import DDL, UniqueConstraint, event
+from sqlalchemy.types import LargeBinary, TypeDecorator
+from sqlalchemy.engine import Engine
+from datetime import datetime, timezone
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+
+__all__ = ['db', 'password_hasher', 'User', 'Company', 'EarningsCallTranscript', 'AnalysisReport', 'UserWatchlist',
+           'CompressedText', 'CompressedJSON', 'get_current_datetime']
 
 
 db = SQLAlchemy()
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
 
 def get_current_datetime():
-    return datetime.now()
+    # Naive UTC: the DateTime columns carry no timezone, so every timestamp is stored the same way
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tunes SQLite connections for a read-heavy workload: WAL journaling, so that reads
+    can run concurrently with a writer instead of blocking on it, fewer fsyncs,
+    memory-mapped reads (256 MB), a 64 MB page cache and in-memory temp tables.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+class CompressedText(TypeDecorator):
+    """
+    Text column stored zstd-compressed.
+    Rows written before compression was introduced hold plain text and are returned as-is.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zstd.ZstdCompressor(level=3).compress(value.encode('utf-8'))
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return zstd.ZstdDecompressor().decompress(value).decode('utf-8')
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON column stored zstd-compressed.
+    Rows written before compression was introduced hold plain JSON text and are parsed as-is.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zstd.ZstdCompressor(level=3).compress(orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return orjson.loads(value)
+        return orjson.loads(zstd.ZstdDecompressor().decompress(value))
 
 class User(db.Model, UserMixin):
     """Contains all instances of users"""
@@ -21,7 +89,7 @@ class User(db.Model, UserMixin):
     user_id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True)
-    password_hash = db.Column(db.String(255), nullable=False)
+    password_hash = db.Column(db.String(512), nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=get_current_datetime)
     updated_at = db.Column(db.DateTime, default=get_current_datetime, onupdate=get_current_datetime)
     last_login_at = db.Column(db.DateTime)
@@ -31,13 +99,31 @@ class User(db.Model, UserMixin):
         return str(self.user_id)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """
+        Verifies a password against the stored hash.
+        Legacy Werkzeug hashes (and outdated argon2 parameters) are re-hashed
+        on a successful check; the caller is responsible for committing.
+        """
+        if not self.password_hash.startswith('$argon2'):
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+
+        try:
+            password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if password_hasher.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
 
     # Relationships
     analysis_reports = db.relationship('AnalysisReport', backref='user', lazy=True, cascade="all, delete-orphan")
+    watchlist_items = db.relationship('UserWatchlist', backref='user', lazy=True, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<User {self.username} (Active: {self.is_active})>"
@@ -53,12 +139,42 @@ class Company(db.Model):
     logo_url = db.Column(db.String(255))
     last_updated = db.Column(db.DateTime, default=get_current_datetime, onupdate=get_current_datetime)
 
+    # Case-insensitive prefix searches on the name (pattern ops let PostgreSQL use the btree for LIKE 'abc%')
+    __table_args__ = (db.Index('ix_companies_name_lower', db.func.lower(company_name).label('company_name_lower'),
+                               postgresql_ops={'company_name_lower': 'varchar_pattern_ops'}),)
+
     # Relationships
     earnings_call_transcripts = db.relationship('EarningsCallTranscript', backref='company', lazy=True)
 
     def __repr__(self):
         return f"<Company {self.ticker_symbol} ({self.company_name})>"
 
+# Full-text search index over companies (SQLite FTS5), kept in sync by triggers.
+# The index stores its own copy of the columns and is keyed by ticker_symbol: companies has a TEXT
+# primary key, so its implicit rowid may change on VACUUM and cannot anchor an external-content index.
+# The index is dropped and refilled, so create_all() also backfills (and migrates) existing databases.
+COMPANIES_FTS_DDL = (
+    "DROP TRIGGER IF EXISTS companies_fts_ai",
+    "DROP TRIGGER IF EXISTS companies_fts_ad",
+    "DROP TRIGGER IF EXISTS companies_fts_au",
+    "DROP TABLE IF EXISTS companies_fts",
+    "CREATE VIRTUAL TABLE companies_fts USING fts5(ticker_symbol, company_name, industry, sector)",
+    "CREATE TRIGGER companies_fts_ai AFTER INSERT ON companies BEGIN "
+    "INSERT INTO companies_fts(ticker_symbol, company_name, industry, sector) "
+    "VALUES (new.ticker_symbol, new.company_name, new.industry, new.sector); END",
+    "CREATE TRIGGER companies_fts_ad AFTER DELETE ON companies BEGIN "
+    "DELETE FROM companies_fts WHERE ticker_symbol = old.ticker_symbol; END",
+    "CREATE TRIGGER companies_fts_au AFTER UPDATE ON companies BEGIN "
+    "DELETE FROM companies_fts WHERE ticker_symbol = old.ticker_symbol; "
+    "INSERT INTO companies_fts(ticker_symbol, company_name, industry, sector) "
+    "VALUES (new.ticker_symbol, new.company_name, new.industry, new.sector); END",
+    "INSERT INTO companies_fts(ticker_symbol, company_name, industry, sector) "
+    "SELECT ticker_symbol, company_name, industry, sector FROM companies",
+)
+for statement in COMPANIES_FTS_DDL:
+    event.listen(db.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(db.metadata, "before_drop", DDL("DROP TABLE IF EXISTS companies_fts").execute_if(dialect="sqlite"))
+
 class EarningsCallTranscript(db.Model):
     """Stores the raw, processed text of earnings call transcripts."""
     __tablename__ = 'earnings_call_transcripts'
@@ -67,8 +183,8 @@ class EarningsCallTranscript(db.Model):
     fiscal_year = db.Column(db.Integer, nullable=False)
     fiscal_quarter = db.Column(db.Integer, nullable=False)
     call_date = db.Column(db.Date, nullable=False)
-    raw_text = db.Column(db.Text, nullable=False)
-    speaker_segments = db.Column(db.JSON)
+    raw_text = db.Column(CompressedText, nullable=False)
+    speaker_segments = db.Column(CompressedJSON)
     source_url = db.Column(db.String(255))
     fetched_at = db.Column(db.DateTime, nullable=False, default=get_current_datetime)
 
@@ -110,7 +226,7 @@ class AnalysisReport(db.Model):
     gemini_evasiveness_score_q_a = db.Column(db.Float)
     gemini_key_topics_discussed = db.Column(db.JSON)
     gemini_red_flags_identified = db.Column(db.JSON)
-    gemini_raw_response_json = db.Column(db.JSON)
+    gemini_raw_response_json = db.Column(CompressedJSON)
 
     # --- ChatGPT Analysis Fields ---
     chatgpt_summary = db.Column(db.Text)
@@ -120,12 +236,33 @@ class AnalysisReport(db.Model):
     chatgpt_evasiveness_score_q_a = db.Column(db.Float)
     chatgpt_key_topics_discussed = db.Column(db.JSON)
     chatgpt_red_flags_identified = db.Column(db.JSON)
-    chatgpt_raw_response_json = db.Column(db.JSON)
+    chatgpt_raw_response_json = db.Column(CompressedJSON)
 
     comparison_notes = db.Column(db.Text)
 
+    # The unique constraint covers the user+transcript lookups,
+    # the indexes cover the per-user and per-transcript listings (newest first)
     __table_args__ = (UniqueConstraint('user_id', 'transcript_id', 'analysis_date',
-                                       name='_user_transcript_date_uc'),)
+                                       name='_user_transcript_date_uc'),
+                      db.Index('ix_reports_user_date_desc', 'user_id', db.text('analysis_date DESC')),
+                      db.Index('ix_reports_transcript_date_desc', 'transcript_id', db.text('analysis_date DESC')),)
 
     def __repr__(self):
         return f"<AnalysisReport {self.report_id} on Transcript {self.transcript_id} for User {self.user_id} ({self.analysis_date.isoformat()})>"
+
+class UserWatchlist(db.Model):
+    """Stores the companies each user keeps an eye on."""
+    __tablename__ = 'user_watchlists'
+    watchlist_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
+    ticker_symbol = db.Column(db.String(10), db.ForeignKey('companies.ticker_symbol'), nullable=False)
+    added_at = db.Column(db.DateTime, nullable=False, default=get_current_datetime)
+
+    # Unique constraint for preventing duplicate stocks, doubles as the (user_id, ticker_symbol) lookup index
+    __table_args__ = (UniqueConstraint('user_id', 'ticker_symbol', name='_user_ticker_uc'),)
+
+    # Relationships
+    company = db.relationship('Company', lazy=True)
+
+    def __repr__(self):
+        return f"<UserWatchlist {self.ticker_symbol} for User {self.user_id}>"
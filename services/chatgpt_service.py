@@ -1,7 +1,81 @@
+import asyncio
+import functools
+import hashlib
 import json
+import logging
+import os
 
-from openai import OpenAI
-from openai import OpenAIError
+import diskcache
+import orjson
+import tiktoken
+
+from openai import AsyncOpenAI, OpenAI
+from openai import OpenAIError, APIConnectionError, InternalServerError, RateLimitError
+
+from . import parallel_runner
+from .json_stream import iter_top_level_items
+
+logger = logging.getLogger(__name__)
+
+# Static parts of the analysis prompt, built once. Keeping them byte-identical
+# across requests also lets OpenAI's automatic prompt caching match the prefix.
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a financial analyst AI specializing in dissecting earnings call transcripts. Your goal is to provide concise, factual, and insightful analysis, identifying sentiment, key topics, and any signs of management spin or evasiveness. Focus on the financial implications. **Always return your analysis as a JSON object.**"
+}
+USER_PREFIX = "Here is an earnings call transcript:\n\n---\n"
+USER_SUFFIX = "\n---\n\nBased on the transcript, "
+JSON_REMINDER = ". **Ensure the output is valid JSON.**"
+ANALYSIS_CACHE_DIR = os.getenv("EBITA_LLM_CACHE_DIR", "~/.cache/my-ebita/llm")
+ANALYSIS_CACHE_EXPIRE_SECONDS = 30 * 86400
+REDUCE_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a financial analyst AI. You are given JSON analyses of consecutive, slightly overlapping chunks of one earnings call transcript. Merge these per-chunk JSON analyses into a single analysis of the whole call, following the requested schema exactly: deduplicate repeated findings, reconcile scores, and keep the most specific evidence. **Always return your analysis as a JSON object.**"
+}
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+BATCH_POLL_INITIAL_DELAY_SECONDS = 2.0
+BATCH_POLL_MAX_DELAY_SECONDS = 300.0
+MULTITASK_INSTRUCTION = (
+    "Analyze each transcript above according to the prompt with the same number. "
+    'Return a JSON object {"results": [{"id": <transcript number>, "analysis": {...}}, ...]} '
+    "with exactly one entry per transcript. **Ensure the output is valid JSON.**"
+)
+# Completion token ceiling per model family (longest prefix wins); a packed request must fit under it
+MAX_OUTPUT_TOKENS = {
+    "gpt-4o": 16384,
+    "gpt-4o-mini": 16384,
+    "gpt-4.1": 32768,
+    "gpt-4-turbo": 4096,
+    "gpt-3.5-turbo": 4096,
+}
+DEFAULT_MAX_OUTPUT_TOKENS = 16384
+
+
+@functools.lru_cache(maxsize=None)
+def _get_analysis_cache() -> diskcache.Cache:
+    """
+    Opens the on-disk analysis cache on first use, so importing the module touches no files.
+    """
+    return diskcache.Cache(os.path.expanduser(ANALYSIS_CACHE_DIR))
+
+
+def _max_output_tokens(model_name: str) -> int:
+    """
+    Returns how many completion tokens a model can produce in one response.
+    """
+    prefixes = [prefix for prefix in MAX_OUTPUT_TOKENS if model_name.startswith(prefix)]
+    return MAX_OUTPUT_TOKENS[max(prefixes, key=len)] if prefixes else DEFAULT_MAX_OUTPUT_TOKENS
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(model_name: str) -> tiktoken.Encoding:
+    """
+    Returns the tokenizer for a model, falling back to o200k_base for models tiktoken does not know.
+    """
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
 
 
 class ChatGPTService:
@@ -24,12 +98,16 @@ class ChatGPTService:
         self.api_key = api_key
         self.client = OpenAI(api_key=self.api_key)
         self.model_name = model_name
-        print(f"ChatGPTService initialized with model: {self.model_name}")
+        logger.debug("ChatGPTService initialized with model: %s", self.model_name)
 
-    def analyze_transcript(self, transcript_text: str, user_prompt: str, max_tokens: int = 2500) -> dict:
+    def analyze_transcript(self, transcript_text: str, user_prompt: str, max_tokens: int = 2500,
+                           use_cache: bool = False) -> dict:
         """
         Sends an earnings call transcript and a user-defined prompt to the ChatGPT model
-        for analysis.
+        for analysis. With use_cache, successful analyses are kept on disk for 30 days in
+        EBITA_LLM_CACHE_DIR (default ~/.cache/my-ebita/llm), keyed by the full request
+        (model, messages and generation parameters), so re-running the same analysis
+        skips the API call.
 
         Args:
             transcript_text (str): The full text of the earnings call transcript.
@@ -37,6 +115,7 @@ class ChatGPTService:
                                 identify overall sentiment, and highlight any evasive language
                                 from management regarding future guidance.").
             max_tokens (int): The maximum number of tokens for the model's response.
+            use_cache (bool): Whether to answer from (and store into) the analysis cache.
 
         Returns:
             dict: A dictionary containing the AI's analysis, or an error message.
@@ -45,15 +124,112 @@ class ChatGPTService:
         if not transcript_text:
             return {"error": "Transcript text cannot be empty for analysis.", "success": False}
 
+        params = self._completion_params(transcript_text, user_prompt, max_tokens)
+        if use_cache:
+            cache_key = hashlib.blake2b(orjson.dumps(params, option=orjson.OPT_SORT_KEYS),
+                                        digest_size=16).hexdigest()
+            cached_result = _get_analysis_cache().get(cache_key)
+            if cached_result is not None:
+                return cached_result
+
+        try:
+            logger.debug("Sending request to OpenAI model: %s...", self.model_name)
+            response = self.client.chat.completions.create(**params)
+        except OpenAIError as e:
+            logger.exception("OpenAI API Error: %s", e)
+            return {"error": f"Failed to get analysis from ChatGPT: {e}", "success": False}
+        except Exception as e:
+            logger.exception("An unexpected error occurred: %s", e)
+            return {"error": f"An unexpected error occurred: {e}", "success": False}
+
+        result = self._parse_analysis(response.choices[0].message.content)
+        if use_cache and result["success"]:
+            _get_analysis_cache().set(cache_key, result, expire=ANALYSIS_CACHE_EXPIRE_SECONDS)
+        return result
+
+    def analyze_transcript_stream(self, transcript_text: str, user_prompt: str, max_tokens: int = 2500):
+        """
+        Streaming version of analyze_transcript: the answer is parsed while it is still
+        being generated, so each top-level key of the analysis (e.g. "summary") can be
+        used as soon as the model has finished writing it.
+
+        Args:
+            transcript_text (str): The full text of the earnings call transcript.
+            user_prompt (str): The specific instruction for the AI.
+            max_tokens (int): The maximum number of tokens for the model's response.
+
+        Yields:
+            tuple: (key, value) for each top-level key of the JSON analysis, in answer order.
+
+        Raises:
+            ValueError: If the transcript text is empty.
+            OpenAIError: If the request fails.
+            ijson.JSONError: If the model's answer is not valid JSON.
+        """
+        if not transcript_text:
+            raise ValueError("Transcript text cannot be empty for analysis.")
+
+        logger.debug("Streaming request to OpenAI model: %s...", self.model_name)
+        stream = self.client.chat.completions.create(stream=True,
+                                                     **self._completion_params(transcript_text, user_prompt, max_tokens))
+        with stream:
+            yield from iter_top_level_items(
+                chunk.choices[0].delta.content
+                for chunk in stream
+                if chunk.choices and chunk.choices[0].delta.content
+            )
+
+    def analyze_long_transcript(self, transcript_text: str, user_prompt: str, chunk_tokens: int = 2000,
+                                overlap: int = 200, max_tokens: int = 2500, max_concurrent: int = 8) -> dict:
+        """
+        Analyzes a transcript too long for a single request by map-reduce: the transcript is
+        split into overlapping chunks that are analyzed concurrently, then one final request
+        merges the per-chunk analyses into the requested schema. Wall-clock time is about one
+        chunk's latency plus the merge, instead of the sum over all chunks.
+
+        Args:
+            transcript_text (str): The full text of the earnings call transcript.
+            user_prompt (str): The specific instruction for the AI, applied to every chunk and to the merge.
+            chunk_tokens (int): The size of each chunk, in tokens.
+            overlap (int): How many tokens consecutive chunks share, so statements cut at a
+                           chunk boundary are still seen whole.
+            max_tokens (int): The maximum number of tokens for each response.
+            max_concurrent (int): How many chunk requests may be in flight at once.
+
+        Returns:
+            dict: A dictionary shaped like analyze_transcript's. If any chunk fails, its error is returned.
+        """
+        if not transcript_text:
+            return {"error": "Transcript text cannot be empty for analysis.", "success": False}
+        if chunk_tokens <= 0 or not 0 <= overlap < chunk_tokens:
+            return {"error": "The chunk size must be positive and the overlap between 0 and the chunk size.",
+                    "success": False}
+
+        try:
+            chunks = self._split_transcript(transcript_text, chunk_tokens, overlap)
+        except Exception as e:
+            # tiktoken downloads its encoding files on first use, which fails offline
+            logger.exception("Could not tokenize the transcript: %s", e)
+            return {"error": f"Could not split the transcript into chunks: {e}", "success": False}
+        if len(chunks) == 1:
+            return self.analyze_transcript(transcript_text, user_prompt, max_tokens)
+
+        logger.debug("Analyzing transcript in %d chunks with OpenAI model: %s...", len(chunks), self.model_name)
+        chunk_results = self.analyze_transcripts_batch([(chunk, user_prompt) for chunk in chunks],
+                                                       max_tokens, max_concurrent)
+        for chunk_result in chunk_results:
+            if not chunk_result["success"]:
+                return chunk_result
+
+        chunk_analyses = orjson.dumps([chunk_result["analysis"] for chunk_result in chunk_results]).decode()
         messages = [
-            {"role": "system",
-             "content": "You are a financial analyst AI specializing in dissecting earnings call transcripts. Your goal is to provide concise, factual, and insightful analysis, identifying sentiment, key topics, and any signs of management spin or evasiveness. Focus on the financial implications. **Always return your analysis as a JSON object.**"},
-            {"role": "user",
-             "content": f"Here is an earnings call transcript:\n\n---\n{transcript_text}\n---\n\nBased on the transcript, {user_prompt}. **Ensure the output is valid JSON.**"}
+            REDUCE_SYSTEM_MESSAGE,
+            {"role": "user", "content": "".join((
+                "The requested analysis was: ", user_prompt,
+                "\n\nHere are the per-chunk analyses, in transcript order:\n", chunk_analyses, JSON_REMINDER
+            ))}
         ]
-
         try:
-            print(f"Sending request to OpenAI model: {self.model_name}...")
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
@@ -61,23 +237,393 @@ class ChatGPTService:
                 temperature=0.3,
                 response_format={"type": "json_object"}
             )
+        except OpenAIError as e:
+            logger.exception("OpenAI API Error: %s", e)
+            return {"error": f"Failed to get analysis from ChatGPT: {e}", "success": False}
+        except Exception as e:
+            logger.exception("An unexpected error occurred: %s", e)
+            return {"error": f"An unexpected error occurred: {e}", "success": False}
 
-            analysis_content = response.choices[0].message.content
+        return self._parse_analysis(response.choices[0].message.content)
 
-            parsed_content = json.loads(analysis_content)
-            return {"analysis": parsed_content, "model_used": self.model_name, "success": True}
+    def _split_transcript(self, transcript_text: str, chunk_tokens: int, overlap: int) -> list:
+        """
+        Internal method splitting a transcript into chunks of chunk_tokens tokens,
+        each starting overlap tokens before the end of the previous one.
+        """
+        if overlap >= chunk_tokens:
+            raise ValueError("The chunk overlap must be smaller than the chunk size.")
 
-        except json.JSONDecodeError as e:
-            print(f"JSON Decode Error (critical): {e}. Raw response: {analysis_content}")
-            return {"error": f"Failed to parse AI response as JSON (critical): {e}. Raw: {analysis_content[:200]}...",
-                    "success": False}
+        encoding = _get_encoding(self.model_name)
+        tokens = encoding.encode(transcript_text)
+        step = chunk_tokens - overlap
+        chunks = []
+        for start in range(0, len(tokens), step):
+            chunks.append(encoding.decode(tokens[start:start + chunk_tokens]))
+            if start + chunk_tokens >= len(tokens):
+                break
+        return chunks
+
+    def analyze_transcripts_batch(self, items: list, max_tokens: int = 2500, max_concurrent: int = 8) -> list:
+        """
+        Analyzes many transcripts concurrently instead of one network round trip after another.
+        Blocking wrapper around analyze_transcripts_async, for synchronous callers.
+
+        Args:
+            items (list): (transcript_text, user_prompt) tuples.
+            max_tokens (int): The maximum number of tokens for each response.
+            max_concurrent (int): How many requests may be in flight at once; size it to the
+                                  account's OpenAI rate-limit tier to avoid 429 errors.
+
+        Returns:
+            list: One result dictionary per item, in input order, shaped like analyze_transcript's.
+        """
+        return asyncio.run(self.analyze_transcripts_async(items, max_tokens, max_concurrent))
+
+    async def analyze_transcripts_async(self, items: list, max_tokens: int = 2500, max_concurrent: int = 8) -> list:
+        """
+        Async version of analyze_transcripts_batch, for callers already running an event loop.
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+        async with AsyncOpenAI(api_key=self.api_key) as aclient:
+            return await asyncio.gather(*(
+                self._analyze_transcript_async(aclient, semaphore, transcript_text, user_prompt, max_tokens)
+                for transcript_text, user_prompt in items
+            ))
+
+    def analyze_transcripts(self, items: list, max_requests_per_minute: float, max_tokens_per_minute: float,
+                            max_tokens: int = 2500, max_attempts: int = 5) -> list:
+        """
+        Analyzes many transcripts as fast as the account's rate limits allow, rather than
+        as fast as round trips allow. Requests are dispatched whenever both the RPM and TPM
+        budgets have room, and rate-limited or failed requests are retried with backoff.
+
+        Args:
+            items (list): (transcript_text, user_prompt) tuples.
+            max_requests_per_minute (float): The account's RPM limit for this model.
+            max_tokens_per_minute (float): The account's TPM limit for this model.
+            max_tokens (int): The maximum number of tokens for each response.
+            max_attempts (int): How many times a request is tried before reporting an error.
+
+        Returns:
+            list: One result dictionary per item, in input order, shaped like analyze_transcript's.
+        """
+        return asyncio.run(self._analyze_transcripts_rate_limited(
+            items, max_requests_per_minute, max_tokens_per_minute, max_tokens, max_attempts
+        ))
+
+    async def _analyze_transcripts_rate_limited(self, items: list, max_requests_per_minute: float,
+                                                max_tokens_per_minute: float, max_tokens: int,
+                                                max_attempts: int) -> list:
+        """
+        Internal method running the analyses through the rate-limited parallel runner.
+        """
+        results = [None] * len(items)
+        indexes = [index for index, (transcript_text, _) in enumerate(items) if transcript_text]
+        for index, (transcript_text, _) in enumerate(items):
+            if not transcript_text:
+                results[index] = {"error": "Transcript text cannot be empty for analysis.", "success": False}
+
+        # The runner owns retries, so the client's own retry loop is switched off
+        async with AsyncOpenAI(api_key=self.api_key, max_retries=0) as aclient:
+            requests = [
+                {
+                    "call": functools.partial(aclient.chat.completions.create,
+                                              **self._completion_params(items[index][0], items[index][1], max_tokens)),
+                    "token_estimate": len(items[index][0]) // 4 + max_tokens
+                }
+                for index in indexes
+            ]
+            responses = await parallel_runner.run(
+                requests, max_requests_per_minute, max_tokens_per_minute, max_attempts,
+                retryable_exceptions=(RateLimitError, APIConnectionError, InternalServerError)
+            )
+
+        for index, response in zip(indexes, responses):
+            if isinstance(response, OpenAIError):
+                results[index] = {"error": f"Failed to get analysis from ChatGPT: {response}", "success": False}
+            elif isinstance(response, Exception):
+                results[index] = {"error": f"An unexpected error occurred: {response}", "success": False}
+            else:
+                results[index] = self._parse_analysis(response.choices[0].message.content)
+        return results
+
+    def analyze_transcripts_multitask(self, items: list, k: int = 5, max_tokens: int = 2500,
+                                      max_concurrent: int = 8) -> list:
+        """
+        Analyzes many transcripts by packing up to k of them into each request, which cuts the
+        request count k-fold. Worth it when the account is limited by requests per minute
+        rather than tokens per minute (typically short transcripts on gpt-4o-mini).
+        The packed requests are themselves sent concurrently.
+
+        Args:
+            items (list): (transcript_text, user_prompt) tuples.
+            k (int): How many transcripts to pack into one request, at most; packs shrink so that
+                     k * max_tokens stays within the model's output-token limit.
+            max_tokens (int): The maximum number of response tokens per transcript.
+            max_concurrent (int): How many requests may be in flight at once.
+
+        Returns:
+            list: One result dictionary per item, in input order, shaped like analyze_transcript's.
+        """
+        return asyncio.run(self._analyze_transcripts_multitask_async(items, k, max_tokens, max_concurrent))
+
+    async def _analyze_transcripts_multitask_async(self, items: list, k: int, max_tokens: int,
+                                                   max_concurrent: int) -> list:
+        """
+        Internal method splitting the items into packs of k and sending the packs concurrently.
+        """
+        results = [None] * len(items)
+        indexes = [index for index, (transcript_text, _) in enumerate(items) if transcript_text]
+        for index, (transcript_text, _) in enumerate(items):
+            if not transcript_text:
+                results[index] = {"error": "Transcript text cannot be empty for analysis.", "success": False}
+
+        output_limit = _max_output_tokens(self.model_name)
+        max_tokens = max(1, min(max_tokens, output_limit))
+        k = max(1, min(k, output_limit // max_tokens))
+        packs = [indexes[start:start + k] for start in range(0, len(indexes), k)]
+        semaphore = asyncio.Semaphore(max_concurrent)
+        async with AsyncOpenAI(api_key=self.api_key) as aclient:
+            pack_results = await asyncio.gather(*(
+                self._analyze_pack_async(aclient, semaphore, [items[index] for index in pack], max_tokens)
+                for pack in packs
+            ))
+
+        for pack, pack_result in zip(packs, pack_results):
+            for index, result in zip(pack, pack_result):
+                results[index] = result
+        return results
+
+    async def _analyze_pack_async(self, aclient: AsyncOpenAI, semaphore: asyncio.Semaphore,
+                                  pack: list, max_tokens: int) -> list:
+        """
+        Internal method sending one request holding several numbered transcripts,
+        then splitting the answer back into one result per transcript.
+        """
+        content = "\n".join(
+            f"=== TRANSCRIPT {number} ===\n{transcript_text}\n=== PROMPT {number} ===\n{user_prompt}"
+            for number, (transcript_text, user_prompt) in enumerate(pack, start=1)
+        )
+        params = {
+            "model": self.model_name,
+            "messages": [SYSTEM_MESSAGE, {"role": "user", "content": "".join((content, "\n\n", MULTITASK_INSTRUCTION))}],
+            "max_tokens": min(max_tokens * len(pack), _max_output_tokens(self.model_name)),
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"}
+        }
+
+        try:
+            async with semaphore:
+                response = await aclient.chat.completions.create(**params)
         except OpenAIError as e:
-            print(f"OpenAI API Error: {e}")
+            logger.exception("OpenAI API Error: %s", e)
+            return [{"error": f"Failed to get analysis from ChatGPT: {e}", "success": False} for _ in pack]
+        except Exception as e:
+            logger.exception("An unexpected error occurred: %s", e)
+            return [{"error": f"An unexpected error occurred: {e}", "success": False} for _ in pack]
+
+        parsed = self._parse_analysis(response.choices[0].message.content)
+        if not parsed["success"]:
+            return [dict(parsed) for _ in pack]
+
+        # Anything but {"results": [...]} leaves every transcript without an analysis
+        answer = parsed["analysis"]
+        entries = answer.get("results") if isinstance(answer, dict) else None
+        analyses = {}
+        for entry in entries if isinstance(entries, list) else []:
+            try:
+                analyses[int(entry["id"])] = entry["analysis"]
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        return [
+            {"analysis": analyses[number], "model_used": self.model_name, "success": True}
+            if number in analyses else
+            {"error": f"ChatGPT returned no analysis for transcript {number} of the batch.", "success": False}
+            for number in range(1, len(pack) + 1)
+        ]
+
+    def submit_batch(self, items: list, max_tokens: int = 2500):
+        """
+        Submits many analyses to the OpenAI Batch API, for backfills and other runs that
+        do not need an answer right away. Batches cost half the price of regular requests,
+        draw on a separate rate-limit pool and complete within 24 hours.
+
+        Args:
+            items (list): (transcript_text, user_prompt) tuples. Item i gets the custom_id "req-i".
+            max_tokens (int): The maximum number of tokens for each response.
+
+        Returns:
+            str: The batch ID to hand to poll_batch, or None if the batch could not be submitted.
+        """
+        lines = [
+            orjson.dumps({
+                "custom_id": f"req-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._completion_params(transcript_text, user_prompt, max_tokens)
+            })
+            for index, (transcript_text, user_prompt) in enumerate(items)
+            if transcript_text
+        ]
+        if not lines:
+            logger.warning("No transcripts to submit: every transcript text is empty.")
+            return None
+
+        try:
+            input_file = self.client.files.create(file=("batch.jsonl", b"\n".join(lines)),
+                                                  purpose="batch")
+            batch = self.client.batches.create(input_file_id=input_file.id, endpoint="/v1/chat/completions",
+                                               completion_window="24h")
+        except OpenAIError as e:
+            logger.exception("OpenAI API Error: %s", e)
+            return None
+        logger.info("Submitted batch %s with %d requests.", batch.id, len(lines))
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> dict:
+        """
+        Waits for a batch submitted with submit_batch to finish and collects its results.
+        Blocking wrapper around wait_batch, for synchronous callers.
+
+        Args:
+            batch_id (str): The ID returned by submit_batch.
+
+        Returns:
+            dict: Result dictionaries shaped like analyze_transcript's, keyed by custom_id
+                  ("req-0", "req-1", ...), or None if the batch did not complete.
+        """
+        return asyncio.run(self.wait_batch(batch_id))
+
+    async def wait_batch(self, batch_id: str) -> dict:
+        """
+        Async version of poll_batch. Status checks back off exponentially (2s growing 1.5x
+        per check, capped at 5 minutes), so a batch can be awaited for hours without
+        holding a thread.
+        """
+        async with AsyncOpenAI(api_key=self.api_key) as aclient:
+            return await self._wait_batch(aclient, batch_id)
+
+    async def wait_batches(self, batch_ids: list) -> list:
+        """
+        Waits for many batches at once, polling all of them concurrently on one event loop.
+
+        Args:
+            batch_ids (list): IDs returned by submit_batch.
+
+        Returns:
+            list: The results of each batch (as returned by poll_batch), in input order.
+        """
+        async with AsyncOpenAI(api_key=self.api_key) as aclient:
+            return await asyncio.gather(*(self._wait_batch(aclient, batch_id) for batch_id in batch_ids))
+
+    async def _wait_batch(self, aclient: AsyncOpenAI, batch_id: str) -> dict:
+        """
+        Internal method polling one batch until it reaches a terminal status, then downloading its results.
+        """
+        delay = BATCH_POLL_INITIAL_DELAY_SECONDS
+        try:
+            batch = await aclient.batches.retrieve(batch_id)
+            while batch.status not in BATCH_TERMINAL_STATUSES:
+                await asyncio.sleep(delay)
+                delay = min(delay * 1.5, BATCH_POLL_MAX_DELAY_SECONDS)
+                batch = await aclient.batches.retrieve(batch_id)
+        except OpenAIError as e:
+            logger.exception("OpenAI API Error: %s", e)
+            return None
+
+        if batch.status != "completed":
+            logger.warning("Batch %s ended with status: %s", batch_id, batch.status)
+            return None
+
+        try:
+            results = {}
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    output = await aclient.files.content(file_id)
+                    results.update(self._parse_batch_output(output.text))
+        except OpenAIError as e:
+            logger.exception("OpenAI API Error: %s", e)
+            return None
+        return results
+
+    def _parse_batch_output(self, output: str) -> dict:
+        """
+        Internal method turning a batch output (or error) JSONL file into result dictionaries.
+        """
+        results = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                error = record.get("error") or response.get("body", {}).get("error")
+                results[record["custom_id"]] = {"error": f"Failed to get analysis from ChatGPT: {error}",
+                                                "success": False}
+            else:
+                content = response["body"]["choices"][0]["message"]["content"]
+                results[record["custom_id"]] = self._parse_analysis(content)
+        return results
+
+    async def _analyze_transcript_async(self, aclient: AsyncOpenAI, semaphore: asyncio.Semaphore,
+                                        transcript_text: str, user_prompt: str, max_tokens: int) -> dict:
+        """
+        Internal method sending a single analysis request on the async client.
+        """
+        if not transcript_text:
+            return {"error": "Transcript text cannot be empty for analysis.", "success": False}
+
+        try:
+            async with semaphore:
+                response = await aclient.chat.completions.create(**self._completion_params(transcript_text, user_prompt, max_tokens))
+        except OpenAIError as e:
+            logger.exception("OpenAI API Error: %s", e)
             return {"error": f"Failed to get analysis from ChatGPT: {e}", "success": False}
         except Exception as e:
-            print(f"An unexpected error occurred: {e}")
+            logger.exception("An unexpected error occurred: %s", e)
             return {"error": f"An unexpected error occurred: {e}", "success": False}
 
+        return self._parse_analysis(response.choices[0].message.content)
+
+    def _completion_params(self, transcript_text: str, user_prompt: str, max_tokens: int) -> dict:
+        """
+        Internal method building the chat completion request shared by the sync and async paths.
+        """
+        messages = [
+            SYSTEM_MESSAGE,
+            {"role": "user", "content": "".join((USER_PREFIX, transcript_text, USER_SUFFIX, user_prompt, JSON_REMINDER))}
+        ]
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"}
+        }
+
+    def _parse_analysis(self, analysis_content: str) -> dict:
+        """
+        Internal method turning the model's JSON answer into the result dictionary.
+        """
+        try:
+            parsed_content = orjson.loads(analysis_content)
+        except json.JSONDecodeError as e:
+            logger.exception("JSON Decode Error (critical): %s. Raw response: %s", e, analysis_content)
+            return {"error": f"Failed to parse AI response as JSON (critical): {e}. Raw: {analysis_content[:200]}...",
+                    "success": False}
+        return {"analysis": parsed_content, "model_used": self.model_name, "success": True}
+
+
+@functools.lru_cache(maxsize=8)
+def get_chatgpt_service(api_key: str, model_name: str = "gpt-4o-mini") -> ChatGPTService:
+    """
+    Returns the process-wide ChatGPTService for this API key and model, creating it on first use,
+    so callers share one OpenAI client (and its connection pool) instead of building one per request.
+    """
+    return ChatGPTService(api_key=api_key, model_name=model_name)
+
 
 # TESTING
 if __name__ == "__main__":
@@ -92,7 +638,7 @@ if __name__ == "__main__":
         print("Please set it before running the example: export OPENAI_API_KEY='your_key_here'")
     else:
         print("Testing ChatGPTService with gpt-4o-mini...")
-        chatgpt_analyzer = ChatGPTService(api_key=OPENAI_API_KEY, model_name="gpt-4o-mini")
+        chatgpt_analyzer = get_chatgpt_service(OPENAI_API_KEY, "gpt-4o-mini")
 
         test_transcript = """
         CEO: "We've had a truly transformative quarter, navigating significant macroeconomic headwinds with unparalleled agility. Our strategic repositioning initiatives are yielding promising preliminary indicators, suggesting robust potential for enhanced shareholder value in the mid-to-long term."
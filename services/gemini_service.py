@@ -1,5 +1,62 @@
+import asyncio
+import functools
+import gzip
+import hashlib
 import json
+import logging
+import os
+import threading
+import weakref
+
+import diskcache
+import httpx
+import orjson
 import requests
+from cachetools import TTLCache
+
+from .http_client import (RateLimitError, TokenBucket, body_prefix, get_session, rate_limit_host,
+                          send_with_retries)
+from .json_stream import iter_top_level_items
+
+logger = logging.getLogger(__name__)
+
+# Static parts of the analysis prompt, built once
+ANALYST_PREAMBLE = (
+    "You are a financial analyst AI specializing in dissecting earnings call transcripts. "
+    "Your goal is to provide concise, factual, and insightful analysis, identifying sentiment, "
+    "key topics, and any signs of management spin or evasiveness. Focus on the financial implications. "
+    "Here is an earnings call transcript:\n\n---\n"
+)
+TRANSCRIPT_SUFFIX = "\n---\n\nBased on the transcript, "
+GENERATION_CACHE_DIR = os.getenv("EBITA_LLM_CACHE_DIR", "~/.cache/my-ebita/llm")
+GENERATION_CACHE_EXPIRE_SECONDS = 30 * 86400
+# The request body around the JSON-escaped prompt, so each call only serializes the prompt string
+_PAYLOAD_PREFIX = b'{"contents":[{"parts":[{"text":'
+_PAYLOAD_SUFFIX = b'}]}],"generationConfig":{"responseMimeType":"application/json"}}'
+# Request bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+# (connect, read) in seconds: a dead endpoint fails fast, a slow generation still gets a minute
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 60
+# How much of a failed response body is logged and quoted in errors
+ERROR_BODY_LIMIT = 1024
+# Client-side request budget for the Gemini host, shared by every instance (set it to your quota)
+MAX_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_MAX_REQUESTS_PER_MINUTE", "60"))
+_rate_limiter = TokenBucket(MAX_REQUESTS_PER_MINUTE, period=60)
+rate_limit_host("generativelanguage.googleapis.com", _rate_limiter)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_generation_cache() -> diskcache.Cache:
+    """
+    Opens the on-disk generation cache on first use, so importing the module touches no files.
+    """
+    return diskcache.Cache(os.path.expanduser(GENERATION_CACHE_DIR))
+
+
+# In-process layer in front of the disk cache: repeated prompts become a dict lookup
+_recent_generations = TTLCache(maxsize=1024, ttl=3600)
+_recent_generations_lock = threading.Lock()
 
 
 class GeminiService:
@@ -8,13 +65,16 @@ class GeminiService:
     Designed to provide analysis on earnings call transcripts.
     """
 
-    def __init__(self, api_key: str, default_model: str = "gemini-2.5-flash"):
+    def __init__(self, api_key: str, default_model: str = "gemini-2.5-flash", compress_requests: bool = False):
         """
         Initializes the GeminiService.
 
         Args:
             api_key (str): The API key to authenticate with the Gemini API.
             default_model (str): The default Gemini model to use for content generation.
+            compress_requests (bool): Gzip request bodies over 1 KB (Content-Encoding: gzip).
+                                      Transcripts compress 5-10x, but this is off by default
+                                      until the endpoint is confirmed to accept compressed bodies.
         """
         if not api_key:
             raise ValueError("Gemini API key cannot be empty.")
@@ -22,20 +82,59 @@ class GeminiService:
         self.api_key = api_key
         self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/"
         self.default_model = default_model
+        self.compress_requests = compress_requests
         self.headers = {
             'Content-Type': 'application/json',
             'X-goog-api-key': self.api_key
         }
-        print(f"GeminiService initialized with model: {self.default_model}")
 
-    def _make_request(self, model_name: str, contents: list) -> dict:
+        # Async clients by the event loop they belong to, created on first async call (see _get_async_client)
+        self._async_clients = weakref.WeakKeyDictionary()
+        logger.debug("GeminiService initialized with model: %s", self.default_model)
+
+    @functools.cached_property
+    def session(self) -> requests.Session:
+        """The shared keep-alive session, looked up on the first synchronous request."""
+        return get_session()
+
+    async def aclose(self):
+        """Closes the running event loop's async client, if it was created."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def __aenter__(self):
+        self._get_async_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Internal method returning the async client of the running event loop, creating it on first use.
+        An httpx client cannot be used once its loop is closed, so each loop (each asyncio.run, say)
+        gets its own and the process-wide service from get_gemini_service works across them.
+        Use `async with service:` so the loop's connections are released before it ends.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                base_url=self.base_url, headers=self.headers, http2=True,
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        return client
+
+    def _make_request(self, model_name: str, prompt_text: str) -> dict:
         """
         Internal method to construct and send the API request.
         This method now includes the 'generationConfig' for JSON output.
 
         Args:
             model_name (str): The specific Gemini model to target.
-            contents (list): The list of content parts for the request body.
+            prompt_text (str): The text input, wrapped into the request body when it is serialized.
 
         Returns:
             dict: The JSON response from the API.
@@ -43,35 +142,72 @@ class GeminiService:
         Raises:
             requests.exceptions.RequestException: For network-related errors.
             ValueError: For API errors (non-2xx status codes) or unexpected response format.
+            RateLimitError: A ValueError raised when 429 responses outlast the retries.
         """
         url = f"{self.base_url}{model_name}:generateContent"
-        payload = {
-            "contents": contents,
-            "generationConfig": {
-                "responseMimeType": "application/json"
-            }
-        }
+        body, headers = self._encode_request(prompt_text)
 
+        _rate_limiter.acquire()
         try:
-            response = requests.post(url, headers=self.headers, json=payload, timeout=60)
+            response = self.session.post(url, data=body, headers={**self.headers, **headers},
+                                         timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
             response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            body_preview = body_prefix(e.response.content, ERROR_BODY_LIMIT)
+            logger.error("Gemini HTTP %s: %s", e.response.status_code, body_preview)
+            error_message = f"Gemini API returned an HTTP error {e.response.status_code}: {body_preview}"
+            if e.response.status_code == 429:
+                raise RateLimitError.from_response(error_message, e.response) from e
+            raise ValueError(error_message) from e
 
-            return response.json()
+        # orjson.JSONDecodeError is a ValueError, as documented above
+        return orjson.loads(response.content)
 
-        except requests.exceptions.HTTPError as e:
-            error_message = f"Gemini API returned an HTTP error {e.response.status_code}: {e.response.text}"
-            print(f"Error details: {json.dumps(e.response.json(), indent=2)}")
+    async def _make_request_async(self, client: httpx.AsyncClient, model_name: str, prompt_text: str) -> dict:
+        """
+        Async twin of _make_request, sent on a shared httpx client.
+
+        Raises:
+            requests.exceptions.RequestException: For network-related errors.
+            ValueError: For API errors (non-2xx status codes) or unexpected response format.
+            RateLimitError: A ValueError raised when 429 responses outlast the retries.
+        """
+        body, headers = self._encode_request(prompt_text)
+        async def send():
+            await _rate_limiter.acquire_async()
+            # Absolute, like the sync path: httpx would read "gemini-2.5-flash:..." as a URL scheme
+            return await client.post(f"{self.base_url}{model_name}:generateContent", content=body, headers=headers)
+
+        try:
+            response = await send_with_retries(send)
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except httpx.HTTPStatusError as e:
+            body_preview = body_prefix(e.response.content, ERROR_BODY_LIMIT)
+            logger.error("Gemini HTTP %s: %s", e.response.status_code, body_preview)
+            error_message = f"Gemini API returned an HTTP error {e.response.status_code}: {body_preview}"
+            if e.response.status_code == 429:
+                raise RateLimitError.from_response(error_message, e.response) from e
             raise ValueError(error_message) from e
-        except requests.exceptions.ConnectionError as e:
-            raise requests.exceptions.RequestException(f"Network connection error to Gemini API: {e}") from e
-        except requests.exceptions.Timeout as e:
-            raise requests.exceptions.RequestException(f"Gemini API request timed out: {e}") from e
-        except requests.exceptions.RequestException as e:
-            raise requests.exceptions.RequestException(f"An unexpected request error occurred: {e}") from e
+        except httpx.RequestError as e:
+            raise requests.exceptions.RequestException(f"Request error to Gemini API: {e}") from e
         except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to decode JSON from Gemini API response: {e}. Response: {response.text}") from e
-        except Exception as e:
-            raise Exception(f"An unknown error occurred during API call: {e}") from e
+            raise ValueError(f"Failed to decode JSON from Gemini API response: {e}. "
+                             f"Response: {body_prefix(response.content, ERROR_BODY_LIMIT)}") from e
+
+    def _encode_request(self, prompt_text: str) -> tuple:
+        """
+        Internal method building the request body for a prompt (asking for JSON output)
+        by splicing the orjson-escaped prompt into the fixed payload, gzipping it when enabled.
+        Only the headers this body needs on top of self.headers (Content-Encoding) are returned.
+
+        Returns:
+            tuple: (body bytes, extra headers dict)
+        """
+        body = _PAYLOAD_PREFIX + orjson.dumps(prompt_text) + _PAYLOAD_SUFFIX
+        if self.compress_requests and len(body) > GZIP_MIN_BYTES:
+            return gzip.compress(body, compresslevel=1), {"Content-Encoding": "gzip"}
+        return body, {}
 
     def analyze_transcript(self, transcript_text: str, user_prompt: str, model_name: str = None) -> dict:
         """
@@ -92,13 +228,7 @@ class GeminiService:
         """
         model_to_use = model_name if model_name else self.default_model
 
-        full_prompt = (
-            "You are a financial analyst AI specializing in dissecting earnings call transcripts. "
-            "Your goal is to provide concise, factual, and insightful analysis, identifying sentiment, "
-            "key topics, and any signs of management spin or evasiveness. Focus on the financial implications. "
-            f"Here is an earnings call transcript:\n\n---\n{transcript_text}\n---\n\n"
-            f"Based on the transcript, {user_prompt}"
-        )
+        full_prompt = "".join((ANALYST_PREAMBLE, transcript_text, TRANSCRIPT_SUFFIX, user_prompt))
 
         try:
             parsed_analysis = self.generate_content(full_prompt, model_name=model_to_use)
@@ -108,17 +238,21 @@ class GeminiService:
                 "success": True
             }
         except (ValueError, requests.exceptions.RequestException, Exception) as e:
-            print(f"Error in analyze_transcript: {e}")
+            logger.exception("Error in analyze_transcript: %s", e)
             return {"error": f"Failed to get analysis from Gemini: {e}", "success": False}
 
-    def generate_content(self, prompt_text: str, model_name: str = None) -> dict:
+    def generate_content(self, prompt_text: str, model_name: str = None, use_cache: bool = True) -> dict:
         """
         Generates content from a text prompt using the Gemini API.
         The API is now configured to return pure JSON, so no regex extraction needed.
+        Answers are cached on disk for 30 days and in memory for an hour, keyed by model and
+        prompt, so an identical prompt skips the API call. Cached answers are shared, so
+        treat the returned dictionary as read-only.
 
         Args:
             prompt_text (str): The text input for the AI.
             model_name (str, optional): Override the default model for this specific call.
+            use_cache (bool): Whether to answer from (and store into) the generation cache.
 
         Returns:
             dict: The parsed JSON content from the AI.
@@ -129,28 +263,155 @@ class GeminiService:
         """
         model_to_use = model_name if model_name else self.default_model
 
-        contents = [
-            {"parts": [{"text": prompt_text}]}
-        ]
+        if use_cache:
+            cache_key = hashlib.blake2b(f"gemini|{model_to_use}|{prompt_text}".encode(), digest_size=16).hexdigest()
+            with _recent_generations_lock:
+                cached_content = _recent_generations.get(cache_key)
+            if cached_content is not None:
+                return cached_content
+            cached_content = _get_generation_cache().get(cache_key)
+            if cached_content is not None:
+                with _recent_generations_lock:
+                    _recent_generations[cache_key] = cached_content
+                return cached_content
+
+        response_data = self._make_request(model_to_use, prompt_text)
+        generated_content = self._parse_generated_json(response_data)
+        if use_cache:
+            _get_generation_cache().set(cache_key, generated_content, expire=GENERATION_CACHE_EXPIRE_SECONDS)
+            with _recent_generations_lock:
+                _recent_generations[cache_key] = generated_content
+        return generated_content
+
+    def generate_content_stream(self, prompt_text: str, model_name: str = None):
+        """
+        Streaming version of generate_content, using the streamGenerateContent endpoint
+        (server-sent events). The answer is parsed while it arrives, so each top-level key
+        can be used as soon as the model has finished writing it.
+
+        Args:
+            prompt_text (str): The text input for the AI.
+            model_name (str, optional): Override the default model for this specific call.
+
+        Yields:
+            tuple: (key, value) for each top-level key of the JSON answer, in answer order.
+
+        Raises:
+            requests.exceptions.RequestException: For network-related errors.
+            ValueError: For API errors (non-2xx status codes).
+            ijson.JSONError: If the model's answer is not valid JSON.
+        """
+        model_to_use = model_name if model_name else self.default_model
+        url = f"{self.base_url}{model_to_use}:streamGenerateContent?alt=sse"
+        body, headers = self._encode_request(prompt_text)
+
+        _rate_limiter.acquire()
+        with self.session.post(url, data=body, headers={**self.headers, **headers}, stream=True,
+                               timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as response:
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                body_preview = body_prefix(e.response.content, ERROR_BODY_LIMIT)
+                logger.error("Gemini HTTP %s: %s", e.response.status_code, body_preview)
+                error_message = f"Gemini API returned an HTTP error {e.response.status_code}: {body_preview}"
+                if e.response.status_code == 429:
+                    raise RateLimitError.from_response(error_message, e.response) from e
+                raise ValueError(error_message) from e
+            yield from iter_top_level_items(self._iter_stream_text(response))
+
+    @staticmethod
+    def _iter_stream_text(response: requests.Response):
+        """
+        Internal method yielding the text parts of each server-sent event of a streamed response.
+        """
+        for line in response.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            event = orjson.loads(line[5:])
+            for candidate in event.get("candidates", [])[:1]:
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield part["text"]
+
+    async def agenerate_content(self, prompt_text: str, model_name: str = None) -> dict:
+        """
+        Async version of generate_content, sent on the service's shared HTTP/2 client.
+        """
+        model_to_use = model_name if model_name else self.default_model
+        return await self._generate_content_async(self._get_async_client(), prompt_text, model_to_use)
+
+    def generate_many(self, prompts: list, model_name: str = None, max_concurrent: int = 32) -> list:
+        """
+        Generates content for many prompts concurrently, multiplexed over a single HTTP/2 connection.
+        Blocking wrapper around generate_many_async, for synchronous callers.
+
+        Args:
+            prompts (list): The text inputs for the AI.
+            model_name (str, optional): Override the default model for these calls.
+            max_concurrent (int): The maximum number of connections to open.
+
+        Returns:
+            list: The parsed JSON content for each prompt, in input order. Prompts that
+                  failed hold the raised exception instead (ValueError or RequestException).
+        """
+        return asyncio.run(self.generate_many_async(prompts, model_name, max_concurrent))
+
+    async def generate_many_async(self, prompts: list, model_name: str = None, max_concurrent: int = 32) -> list:
+        """
+        Async version of generate_many, for callers already running an event loop.
+        """
+        model_to_use = model_name if model_name else self.default_model
+        limits = httpx.Limits(max_connections=max_concurrent, max_keepalive_connections=16)
+        async with httpx.AsyncClient(base_url=self.base_url, headers=self.headers, http2=True,
+                                     timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT), limits=limits) as client:
+            return await asyncio.gather(
+                *(self._generate_content_async(client, prompt_text, model_to_use) for prompt_text in prompts),
+                return_exceptions=True
+            )
+
+    async def _generate_content_async(self, client: httpx.AsyncClient, prompt_text: str, model_name: str) -> dict:
+        """
+        Internal method generating content for one prompt on the shared async client.
+        """
+        response_data = await self._make_request_async(client, model_name, prompt_text)
+        return self._parse_generated_json(response_data)
 
-        response_data = self._make_request(model_to_use, contents)
+    @staticmethod
+    def _parse_generated_json(response_data: dict) -> dict:
+        """
+        Internal method extracting the model's JSON answer from a generateContent response.
 
+        Raises:
+            ValueError: If the API response does not contain expected JSON.
+        """
         try:
             raw_generated_text = response_data['candidates'][0]['content']['parts'][0]['text']
 
-            parsed_json = json.loads(raw_generated_text)
+            parsed_json = orjson.loads(raw_generated_text)
             return parsed_json
 
         except (KeyError, IndexError) as e:
+            # Indenting the whole response is only worth it when someone reads the debug log
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Unexpected Gemini response: %s", orjson.dumps(response_data, option=orjson.OPT_INDENT_2).decode())
             raise ValueError(
                 f"Unexpected response format from Gemini API. "
-                f"Could not extract text. Error: {e}. Full response: {json.dumps(response_data, indent=2)}"
+                f"Could not extract text. Error: {e}. Response: {orjson.dumps(response_data)[:512].decode('utf-8', 'replace')}"
             )
         except json.JSONDecodeError as e:
-            print(f"DEBUG: JSONDecodeError: Failed to decode what was expected to be pure JSON: '{raw_generated_text[:200]}...'")
+            logger.debug("JSONDecodeError: Failed to decode what was expected to be pure JSON: '%s...'", raw_generated_text[:200])
             raise ValueError(f"Failed to decode JSON from Gemini response: {e}. Raw content: {raw_generated_text[:500]}")
 
 
+@functools.lru_cache(maxsize=8)
+def get_gemini_service(api_key: str, model_name: str = "gemini-2.5-flash") -> GeminiService:
+    """
+    Returns the process-wide GeminiService for this API key and default model, creating it on first use,
+    so callers share its async httpx clients (one per event loop) instead of building one per request.
+    """
+    return GeminiService(api_key=api_key, default_model=model_name)
+
+
 # TESTING
 if __name__ == "__main__":
     import os
@@ -163,7 +424,7 @@ if __name__ == "__main__":
         print("Error: GEMINI_API_KEY environment variable not set for testing.")
     else:
         print("Testing GeminiService with gemini-2.5-flash...")
-        gemini_analyzer = GeminiService(api_key=GEMINI_API_KEY)
+        gemini_analyzer = get_gemini_service(GEMINI_API_KEY)
 
         test_transcript = """
         CEO: "We've had a truly transformative quarter, navigating significant macroeconomic headwinds with unparalleled agility. Our strategic repositioning initiatives are yielding promising preliminary indicators, suggesting robust potential for enhanced shareholder value in the mid-to-long term."
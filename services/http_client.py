@@ -0,0 +1,175 @@
+"""
+HTTP plumbing shared by the API services.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+# Retry policy of every API call, sync (urllib3 Retry on the shared session) and async (send_with_retries)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Longest Retry-After the retries honour before giving up with the error instead
+MAX_RETRY_AFTER_SECONDS = 60
+# Client-side limiter of each rate-limited API host, which the sync retries also draw from
+_host_rate_limiters: Dict[str, "TokenBucket"] = {}
+
+
+def rate_limit_host(host: str, limiter: "TokenBucket"):
+    """
+    Makes the shared session's automatic retries to `host` take a token from `limiter`, like
+    the first attempt the service sends, so a burst of retries cannot bypass the client-side limit.
+    """
+    _host_rate_limiters[host] = limiter
+
+
+class CappedRetry(Retry):
+    """
+    urllib3 Retry policy of the shared session, matching send_with_retries: a Retry-After longer
+    than MAX_RETRY_AFTER_SECONDS hands the response back at once instead of blocking the caller,
+    and every retry to a rate-limited host waits for a token of its limiter.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response is not None:
+            retry_after = self.get_retry_after(response)
+            if retry_after is not None and retry_after > MAX_RETRY_AFTER_SECONDS:
+                raise MaxRetryError(_pool, url, ResponseError(f"Retry-After of {retry_after:g}s is too long"))
+        new_retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        limiter = _host_rate_limiters.get(_pool.host) if _pool is not None else None
+        if limiter is not None:
+            limiter.acquire()
+        return new_retry
+
+
+@functools.lru_cache(maxsize=None)
+def get_session() -> requests.Session:
+    """
+    Builds, on first use, the keep-alive session every service sends its synchronous requests on:
+    one connection pool per host for the whole process, however many service objects are created.
+    Authentication differs per API, so services pass their headers with each request.
+    """
+    session = requests.Session()
+    retry_policy = CappedRetry(total=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, status_forcelist=list(RETRY_STATUSES),
+                         allowed_methods=["GET", "POST"], respect_retry_after_header=True,
+                         raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry_policy))
+    return session
+
+
+async def send_with_retries(send) -> httpx.Response:
+    """
+    Async counterpart of the session's urllib3 Retry policy, for the httpx clients: awaits
+    send() (a zero-argument coroutine function issuing one request) and retries it with
+    exponential backoff on 429/5xx responses and transport errors, honouring Retry-After.
+
+    Returns:
+        httpx.Response: The first response worth handing back, or the last one once retries are exhausted.
+
+    Raises:
+        httpx.TransportError: If the last attempt still failed to get a response.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        last_attempt = attempt == MAX_RETRIES
+        try:
+            response = await send()
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+            delay = BACKOFF_FACTOR * 2 ** attempt
+        else:
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            retry_after = _retry_after_seconds(response)
+            if retry_after is not None and retry_after > MAX_RETRY_AFTER_SECONDS:
+                return response
+            delay = retry_after if retry_after is not None else BACKOFF_FACTOR * 2 ** attempt
+            await response.aclose()
+        await asyncio.sleep(delay)
+
+
+def _retry_after_seconds(response) -> Optional[float]:
+    """Reads a Retry-After header given in seconds (HTTP dates are ignored)."""
+    retry_after = response.headers.get("Retry-After")
+    try:
+        return max(float(retry_after), 0.0) if retry_after else None
+    except ValueError:
+        return None
+
+
+def body_prefix(body: bytes, limit: int) -> str:
+    """
+    Decodes only the start of a response body for logs and error messages, so a huge failed
+    response is neither copied into a string nor parsed in full.
+    """
+    return body[:limit].decode("utf-8", "replace")
+
+
+class RateLimitError(ValueError):
+    """
+    Raised when an API keeps answering 429 Too Many Requests after the retries are exhausted,
+    so callers can tell "try again later" apart from other API errors and defer the work.
+    Subclasses ValueError, which the services already document for non-2xx responses.
+
+    Attributes:
+        retry_after (Optional[float]): Seconds the server asked to wait, if it sent Retry-After.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, message: str, response) -> "RateLimitError":
+        """
+        Builds the error from a requests or httpx 429 response, reading its Retry-After header.
+        """
+        # Retry-After may also be an HTTP date, which is not worth parsing here
+        return cls(message, _retry_after_seconds(response))
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter shared by threads and coroutines: allows up to `rate` requests
+    per `period` seconds (in bursts of at most `rate`), so a fan-out waits locally instead of
+    paying a round trip for a 429. Callers past the budget reserve a slot and sleep until it.
+    """
+
+    def __init__(self, rate: float, period: float = 1.0):
+        self.capacity = rate
+        self.refill_per_second = rate / period
+        self._tokens = rate
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Takes one token (possibly ahead of time), returning how many seconds to wait for it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+            self._updated_at = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.refill_per_second
+
+    def acquire(self):
+        """Blocks the calling thread until a request may be sent."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Waits, without blocking the event loop, until a request may be sent."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
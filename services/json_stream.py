@@ -0,0 +1,29 @@
+"""
+Incremental parsing of a JSON object that arrives in pieces (a streamed model answer),
+so callers can act on each top-level key as soon as its value is complete.
+"""
+
+import ijson
+
+
+def iter_top_level_items(chunks):
+    """
+    Parses a JSON object streamed as text chunks, emitting its top-level items as they complete.
+
+    Args:
+        chunks (iterable): The text (str or bytes) pieces of one JSON object, in order.
+
+    Yields:
+        tuple: (key, value) for each top-level key of the object.
+
+    Raises:
+        ijson.JSONError: If the streamed text is not a valid JSON object.
+    """
+    items = ijson.sendable_list()
+    parser = ijson.kvitems_coro(items, "", use_float=True)
+    for chunk in chunks:
+        parser.send(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        yield from items
+        del items[:]
+    parser.close()
+    yield from items
@@ -1,8 +1,84 @@
+import asyncio
+import functools
+import hashlib
 import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date
 from typing import Optional, Dict, Any
 
+import diskcache
+import httpx
+import orjson
 import requests
 
+from .http_client import (RateLimitError, TokenBucket, body_prefix, get_session, rate_limit_host,
+                          send_with_retries)
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) in seconds: a dead endpoint fails fast, and API Ninjas answers well within the read budget
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+RESPONSE_CACHE_DIR = os.getenv("NINJAS_CACHE_DIR", "~/.cache/my-ebita/ninjas")
+# Data for the current (or a future) quarter may still change, so it is only kept for an hour
+OPEN_QUARTER_EXPIRE_SECONDS = 3600
+# Stale entries with a validator are kept this long, so they can be revalidated with a conditional GET
+REVALIDATION_WINDOW_SECONDS = 30 * 86400
+# How much of a response body error messages quote
+ERROR_BODY_LIMIT = 2048
+# How much of a response body the error log quotes
+LOG_BODY_LIMIT = 512
+# Client-side request budget for the API Ninjas host, shared by every instance
+MAX_REQUESTS_PER_SECOND = float(os.getenv("NINJAS_MAX_REQUESTS_PER_SECOND", "10"))
+_rate_limiter = TokenBucket(MAX_REQUESTS_PER_SECOND)
+rate_limit_host("api.api-ninjas.com", _rate_limiter)
+_VALID_QUARTERS = frozenset({1, 2, 3, 4})
+
+
+@functools.lru_cache(maxsize=None)
+def _get_response_cache() -> diskcache.Cache:
+    """
+    Opens the on-disk response cache on first use, so importing the module touches no files.
+    """
+    return diskcache.Cache(os.path.expanduser(RESPONSE_CACHE_DIR))
+
+
+@functools.lru_cache(maxsize=4096)
+def _norm(ticker: str) -> str:
+    """
+    Normalizes a ticker symbol for the API, remembering the few tickers a batch repeats.
+    """
+    return ticker.strip().upper()
+
+
+@dataclass(slots=True)
+class Transcript:
+    """An earnings call transcript, as returned by NinjasService.get_earnings_transcript."""
+    date: Optional[str]
+    transcript: str
+    transcript_split: Optional[list] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the transcript as the dictionary the service used to return."""
+        return {"date": self.date, "transcript": self.transcript, "transcript_split": self.transcript_split}
+
+
+@dataclass(slots=True)
+class CompanyProfile:
+    """A basic company profile, as returned by NinjasService.get_company_profile_basic."""
+    name: str
+    symbol: str
+    logo_url: str
+
+    def to_dict(self) -> Dict[str, str]:
+        """Returns the profile as the dictionary the service used to return."""
+        return {"name": self.name, "symbol": self.symbol, "logo_url": self.logo_url}
+
 
 class NinjasService:
     """
@@ -24,9 +100,53 @@ class NinjasService:
         self.api_key = api_key
         self.base_url = "https://api.api-ninjas.com/v1/"
         self.headers = {
-            'X-Api-Key': self.api_key
+            'X-Api-Key': self.api_key,
+            # Transcripts are large English text; Brotli is decoded transparently once installed
+            'Accept-Encoding': 'gzip, br'
         }
-        print("NinjasService initialized. Ready to fetch data from API Ninjas!")
+
+        # Async client, created on first async call (see _get_async_client)
+        self._async_client = None
+        # Requests being sent right now, by cache key, so concurrent identical calls share one
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._ainflight: Dict[str, asyncio.Task] = {}
+        logger.debug("NinjasService initialized. Ready to fetch data from API Ninjas!")
+
+    @functools.cached_property
+    def session(self) -> requests.Session:
+        """
+        The process-wide keep-alive session (see http_client.get_session), set up on first use
+        so services that never make a synchronous call never build a connection pool.
+        """
+        return get_session()
+
+    async def aclose(self):
+        """Closes the async client's connections, if it was created."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    async def __aenter__(self):
+        self._get_async_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Internal method returning the shared async client, creating it on first use.
+        The client is bound to the event loop it was first used in, so the async methods
+        should be awaited inside one `async with NinjasService(...)` block.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url, headers=self.headers, http2=True,
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        return self._async_client
 
     def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -43,40 +163,241 @@ class NinjasService:
         Raises:
             requests.exceptions.RequestException: For network-related errors.
             ValueError: For API errors (non-2xx status codes) or unexpected response format.
+            RateLimitError: A ValueError raised when 429 responses outlast the retries.
+        """
+        cache_key = self._cache_key(endpoint, params)
+        cached_entry = self._get_cached_entry(cache_key)
+        if cached_entry is not None and self._is_fresh(cached_entry):
+            return cached_entry["body"]
+
+        # Single flight: the first caller sends the request, concurrent callers wait for its outcome
+        with self._inflight_lock:
+            inflight = self._inflight.get(cache_key)
+            if inflight is None:
+                future = self._inflight[cache_key] = Future()
+        if inflight is not None:
+            return inflight.result()
+
+        try:
+            response_data = self._send_request(endpoint, params, cache_key, cached_entry)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response_data)
+            return response_data
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+
+    def _send_request(self, endpoint: str, params: Dict[str, Any], cache_key: str,
+                      cached_entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Internal method sending the GET request for _make_request (conditional when a stale entry
+        can be revalidated) and caching what comes back. Raises as documented there;
+        connection errors and timeouts propagate as the RequestException subclasses requests raised.
         """
         url = f"{self.base_url}{endpoint}"
-        print(f"Making request to {url} with params: {params}...")
+        logger.debug("Making request to %s with params: %s...", url, params)
+        _rate_limiter.acquire()
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            response = self.session.get(url, params=params, headers={**self.headers, **self._conditional_headers(cached_entry)},
+                                        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+            if response.status_code == 304:
+                return self._revalidate_cached(cache_key, cached_entry, params)
             response.raise_for_status()
 
-            response_json = response.json()
-
-            if isinstance(response_json, list) and not response_json:
-                print(f"No data found for the given parameters.")
-                return None
-            elif isinstance(response_json, list) and response_json:
-                return response_json[0]
-            elif isinstance(response_json, dict):
-                return response_json
-            else:
-                raise ValueError(
-                    f"Unexpected top-level response format from API Ninjas: {type(response_json)}. Full response: {response.text}")
+            response_data = self._unwrap_response(response.content)
+            if response_data:
+                self._cache_response(cache_key, response_data, response.headers, params)
+            return response_data
 
         except requests.exceptions.HTTPError as e:
-            error_message = f"API Ninjas returned an HTTP error {e.response.status_code}: {e.response.text}"
-            print(f"Error details from API Ninjas: {e.response.text}")
+            body_preview = body_prefix(e.response.content, ERROR_BODY_LIMIT)
+            logger.error("API Ninjas HTTP %s: %s", e.response.status_code, body_preview[:LOG_BODY_LIMIT])
+            error_message = f"API Ninjas returned an HTTP error {e.response.status_code}: {body_preview}"
+            if e.response.status_code == 429:
+                raise RateLimitError.from_response(error_message, e.response) from e
+            raise ValueError(error_message) from e
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to decode JSON from API Ninjas response: {e}. Response: {body_prefix(response.content, ERROR_BODY_LIMIT)}") from e
+
+    async def _amake_request(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Async twin of _make_request, sent on the shared async client.
+
+        Raises:
+            requests.exceptions.RequestException: For network-related errors.
+            ValueError: For API errors (non-2xx status codes) or unexpected response format.
+            RateLimitError: A ValueError raised when 429 responses outlast the retries.
+        """
+        cache_key = self._cache_key(endpoint, params)
+        cached_entry = self._get_cached_entry(cache_key)
+        if cached_entry is not None and self._is_fresh(cached_entry):
+            return cached_entry["body"]
+
+        # Single flight, as in _make_request; a request started on another event loop cannot be awaited
+        task = self._ainflight.get(cache_key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._asend_request(endpoint, params, cache_key, cached_entry))
+            self._ainflight[cache_key] = task
+            task.add_done_callback(
+                lambda done: self._ainflight.pop(cache_key) if self._ainflight.get(cache_key) is done else None)
+        # Shielded, so a cancelled caller does not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _asend_request(self, endpoint: str, params: Dict[str, Any], cache_key: str,
+                             cached_entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Async twin of _send_request.
+        """
+        async def send():
+            await _rate_limiter.acquire_async()
+            return await self._get_async_client().get(endpoint, params=params,
+                                                      headers=self._conditional_headers(cached_entry))
+
+        try:
+            response = await send_with_retries(send)
+            # Checked first: httpx's raise_for_status treats every 3xx as an error
+            if response.status_code == 304:
+                return self._revalidate_cached(cache_key, cached_entry, params)
+            response.raise_for_status()
+            response_data = self._unwrap_response(response.content)
+            if response_data:
+                self._cache_response(cache_key, response_data, response.headers, params)
+            return response_data
+        except httpx.HTTPStatusError as e:
+            body_preview = body_prefix(e.response.content, ERROR_BODY_LIMIT)
+            logger.error("API Ninjas HTTP %s: %s", e.response.status_code, body_preview[:LOG_BODY_LIMIT])
+            error_message = f"API Ninjas returned an HTTP error {e.response.status_code}: {body_preview}"
+            if e.response.status_code == 429:
+                raise RateLimitError.from_response(error_message, e.response) from e
             raise ValueError(error_message) from e
-        except requests.exceptions.ConnectionError as e:
-            raise requests.exceptions.RequestException(f"Network connection error to API Ninjas: {e}") from e
-        except requests.exceptions.Timeout as e:
-            raise requests.exceptions.RequestException(f"API Ninjas request timed out: {e}") from e
+        except httpx.RequestError as e:
+            raise requests.exceptions.RequestException(f"Request error to API Ninjas: {e}") from e
         except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to decode JSON from API Ninjas response: {e}. Response: {response.text}") from e
-        except Exception as e:
-            raise Exception(f"An unknown error occurred during API call to API Ninjas: {e}") from e
+            raise ValueError(f"Failed to decode JSON from API Ninjas response: {e}. Response: {body_prefix(response.content, ERROR_BODY_LIMIT)}") from e
+
+    @staticmethod
+    def _cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """
+        Internal method building the response cache key for a request.
+        """
+        return hashlib.sha1(orjson.dumps([endpoint, sorted(params.items())], default=str)).hexdigest()
+
+    @staticmethod
+    def _cache_expiry(params: Dict[str, Any]) -> Optional[int]:
+        """
+        Internal method choosing how long a response is cached: forever for a past quarter,
+        whose transcript is final once published, an hour for anything else. Quarters are
+        compared as calendar quarters, which errs on the side of expiring.
+        """
+        if 'year' in params and 'quarter' in params:
+            today = date.today()
+            if (params['year'], params['quarter']) < (today.year, (today.month - 1) // 3 + 1):
+                return None
+        return OPEN_QUARTER_EXPIRE_SECONDS
 
-    def get_earnings_transcript(self, ticker: str, year: int, quarter: int) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _get_cached_entry(cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Internal method reading a cache entry. Entries written before responses were cached
+        with their validators hold the bare body, and are treated as missing.
+        """
+        cached_entry = _get_response_cache().get(cache_key)
+        if isinstance(cached_entry, dict) and "fresh_until" in cached_entry:
+            return cached_entry
+        return None
+
+    @staticmethod
+    def _is_fresh(cached_entry: Dict[str, Any]) -> bool:
+        """
+        Internal method telling whether a cached response can be served without asking API Ninjas.
+        """
+        return cached_entry["fresh_until"] is None or time.time() < cached_entry["fresh_until"]
+
+    @staticmethod
+    def _conditional_headers(cached_entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Internal method building the If-None-Match / If-Modified-Since headers for a stale cached
+        response, so an unchanged resource comes back as a headers-only 304.
+        """
+        headers = {}
+        if cached_entry is not None:
+            if cached_entry["etag"]:
+                headers['If-None-Match'] = cached_entry["etag"]
+            if cached_entry["last_modified"]:
+                headers['If-Modified-Since'] = cached_entry["last_modified"]
+        return headers
+
+    def _cache_response(self, cache_key: str, body: Dict[str, Any], response_headers, params: Dict[str, Any]):
+        """
+        Internal method caching a parsed response together with its validators (ETag, Last-Modified).
+        """
+        cached_entry = {
+            "body": body,
+            "etag": response_headers.get('ETag'),
+            "last_modified": response_headers.get('Last-Modified'),
+            "fresh_until": None
+        }
+        self._store_cached(cache_key, cached_entry, params)
+
+    def _revalidate_cached(self, cache_key: str, cached_entry: Dict[str, Any], params: Dict[str, Any]):
+        """
+        Internal method handling a 304 Not Modified: the cached body is still current, so it is
+        served again and its freshness renewed.
+        """
+        self._store_cached(cache_key, cached_entry, params)
+        return cached_entry["body"]
+
+    def _store_cached(self, cache_key: str, cached_entry: Dict[str, Any], params: Dict[str, Any]):
+        """
+        Internal method writing a cache entry. An entry that can be revalidated outlives its
+        freshness, so that once stale it costs a 304 rather than a full download.
+        """
+        fresh_seconds = self._cache_expiry(params)
+        if fresh_seconds is None:
+            cached_entry["fresh_until"] = None
+            expire = None
+        else:
+            cached_entry["fresh_until"] = time.time() + fresh_seconds
+            can_revalidate = cached_entry["etag"] or cached_entry["last_modified"]
+            expire = REVALIDATION_WINDOW_SECONDS if can_revalidate else fresh_seconds
+        _get_response_cache().set(cache_key, cached_entry, expire=expire)
+
+    def invalidate(self, ticker: str, year: int, quarter: int) -> bool:
+        """
+        Drops a cached transcript, so the next call fetches it from API Ninjas again.
+
+        Returns:
+            bool: True if a cached transcript was dropped.
+        """
+        cache_key = self._cache_key("earningstranscript", self._transcript_params(ticker, year, quarter))
+        return _get_response_cache().delete(cache_key)
+
+    @staticmethod
+    def _unwrap_response(response_content: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Internal method parsing an API Ninjas response body straight from its bytes
+        and returning its first record (the body is a list or a single object).
+
+        Raises:
+            ValueError: For an unexpected top-level response format.
+            json.JSONDecodeError: If the body is not valid JSON.
+        """
+        response_json = orjson.loads(response_content)
+        if isinstance(response_json, list) and not response_json:
+            logger.debug("No data found for the given parameters.")
+            return None
+        elif isinstance(response_json, list) and response_json:
+            return response_json[0]
+        elif isinstance(response_json, dict):
+            return response_json
+        else:
+            raise ValueError(
+                f"Unexpected top-level response format from API Ninjas: {type(response_json)}. Response: {body_prefix(response_content, ERROR_BODY_LIMIT)}")
+
+    def get_earnings_transcript(self, ticker: str, year: int, quarter: int) -> Optional[Transcript]:
         """
         Fetches the earnings call transcript for a given company, year, and quarter,
         including speaker segmentation if available.
@@ -87,33 +408,80 @@ class NinjasService:
             quarter (int): The fiscal quarter (1, 2, 3, or 4).
 
         Returns:
-            Optional[Dict[str, Any]]: A dictionary containing the transcript date, full text,
-                                      and speaker split (if available).
-                                      Example: {
-                                          "date": "2024-01-30",
-                                          "transcript": "...",
-                                          "transcript_split": [{"speaker": "Operator", "text": "..."}, ...]
-                                      }
-                                      Returns None if the transcript is not found or an error occurs.
+            Optional[Transcript]: The transcript date, full text, and speaker split (if available).
+                                  Example: Transcript(
+                                      date="2024-01-30",
+                                      transcript="...",
+                                      transcript_split=[{"speaker": "Operator", "text": "..."}, ...]
+                                  )
+                                  Returns None if the transcript is not found or an error occurs.
+                                  Use .to_dict() where a plain dictionary is needed.
 
         Raises:
             ValueError, RequestException (propagated from _make_request)
         """
-        if not (1 <= quarter <= 4):
+        transcript_data = self._make_request("earningstranscript", self._transcript_params(ticker, year, quarter))
+        return self._parse_transcript(transcript_data, ticker, year, quarter)
+
+    async def aget_earnings_transcript(self, ticker: str, year: int, quarter: int) -> Optional[Transcript]:
+        """
+        Async version of get_earnings_transcript, so many transcripts can be fetched concurrently
+        (see fetch_transcripts_bulk).
+        """
+        transcript_data = await self._amake_request("earningstranscript", self._transcript_params(ticker, year, quarter))
+        return self._parse_transcript(transcript_data, ticker, year, quarter)
+
+    def get_earnings_transcripts_many(self, jobs: list, max_workers: int = 16) -> dict:
+        """
+        Fetches many earnings call transcripts concurrently on a thread pool sharing the
+        pooled session, for synchronous callers (see fetch_transcripts_bulk for async ones).
+
+        Args:
+            jobs (list): (ticker, year, quarter) tuples.
+            max_workers (int): How many requests may be in flight at once.
+
+        Returns:
+            dict: The transcript (or None) for each (ticker, year, quarter) job. Jobs that failed
+                  hold the raised exception instead (ValueError or RequestException).
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.get_earnings_transcript, ticker, year, quarter): (ticker, year, quarter)
+                       for ticker, year, quarter in jobs}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = e
+        return results
+
+    @staticmethod
+    def _transcript_params(ticker: str, year: int, quarter: int) -> Dict[str, Any]:
+        """
+        Internal method validating the requested period and building the transcript query parameters.
+
+        Raises:
+            ValueError: For an invalid quarter or an unrealistic year.
+        """
+        if quarter not in _VALID_QUARTERS:
             raise ValueError("Quarter must be between 1 and 4.")
         if not (1990 <= year <= 2100): # Realistic year range
             raise ValueError("Year seems a bit off. Please provide a realistic year.")
 
-        params = {
-            'ticker': ticker.upper(),
+        return {
+            'ticker': _norm(ticker),
             'year': year,
             'quarter': quarter
         }
 
-        transcript_data = self._make_request("earningstranscript", params)
-
+    @staticmethod
+    def _parse_transcript(transcript_data: Optional[Dict[str, Any]], ticker: str, year: int,
+                          quarter: int) -> Optional[Transcript]:
+        """
+        Internal method picking the transcript fields out of an earningstranscript record.
+        """
         if not transcript_data:
-            print(f"No transcript found for {ticker} Q{quarter} {year}. The silence is still deafening.")
+            logger.debug("No transcript found for %s Q%s %s. The silence is still deafening.", ticker, quarter, year)
             return None
 
         date_str = transcript_data.get('date')
@@ -121,16 +489,12 @@ class NinjasService:
         transcript_split = transcript_data.get('transcript_split')
 
         if not transcript_text:
-            print(f"Transcript text missing in response for {ticker} Q{quarter} {year}. Just empty words.")
+            logger.warning("Transcript text missing in response for %s Q%s %s. Just empty words.", ticker, quarter, year)
             return None
 
-        return {
-            "date": date_str,
-            "transcript": transcript_text,
-            "transcript_split": transcript_split
-        }
+        return Transcript(date=date_str, transcript=transcript_text, transcript_split=transcript_split)
 
-    def get_company_profile_basic(self, ticker: str) -> Optional[Dict[str, str]]:
+    def get_company_profile_basic(self, ticker: str) -> Optional[CompanyProfile]:
         """
         Fetches basic company profile information (name, symbol, logo URL) using API Ninjas' Logo API.
 
@@ -138,21 +502,30 @@ class NinjasService:
             ticker (str): The stock ticker symbol (e.g., "AAPL", "MSFT").
 
         Returns:
-            Optional[Dict[str, str]]: A dictionary containing 'name', 'symbol' (ticker) and 'logo_url',
+            Optional[CompanyProfile]: The company's name, symbol (ticker) and logo_url,
                                       or None if the company is not found.
-                                      Example: {"name": "Microsoft Corp", "symbol": "MSFT", "logo_url": "..."}
+                                      Example: CompanyProfile(name="Microsoft Corp", symbol="MSFT", logo_url="...")
 
         Raises:
             ValueError, RequestException (propagated from _make_request)
         """
-        params = {
-            'ticker': ticker.upper()
-        }
+        company_data = self._make_request("logo", {'ticker': _norm(ticker)})
+        return self._parse_company_profile(company_data, ticker)
 
-        company_data = self._make_request("logo", params)
+    async def aget_company_profile_basic(self, ticker: str) -> Optional[CompanyProfile]:
+        """
+        Async version of get_company_profile_basic.
+        """
+        company_data = await self._amake_request("logo", {'ticker': _norm(ticker)})
+        return self._parse_company_profile(company_data, ticker)
 
+    @staticmethod
+    def _parse_company_profile(company_data: Optional[Dict[str, Any]], ticker: str) -> Optional[CompanyProfile]:
+        """
+        Internal method picking the profile fields out of a logo record.
+        """
         if not company_data:
-            print(f"No basic profile found for ticker {ticker}.")
+            logger.debug("No basic profile found for ticker %s.", ticker)
             return None
 
         company_name = company_data.get('name')
@@ -160,14 +533,29 @@ class NinjasService:
         company_logo_url = company_data.get('image')
 
         if not company_name or not company_symbol or not company_logo_url:
-            print(f"Missing 'name', 'ticker', or 'image' in basic profile for {ticker}. Incomplete data!")
+            logger.warning("Missing 'name', 'ticker', or 'image' in basic profile for %s. Incomplete data!", ticker)
             return None
 
-        return {
-            "name": company_name,
-            "symbol": company_symbol,
-            "logo_url": company_logo_url,
-        }
+        return CompanyProfile(name=company_name, symbol=company_symbol, logo_url=company_logo_url)
+
+
+async def fetch_transcripts_bulk(service: NinjasService, jobs: list) -> list:
+    """
+    Fetches many earnings call transcripts concurrently, so the wall time is that of
+    the slowest request rather than the sum of all of them.
+
+    Args:
+        service (NinjasService): The service to fetch with.
+        jobs (list): Dictionaries of get_earnings_transcript arguments,
+                     e.g. [{"ticker": "MSFT", "year": 2024, "quarter": 1}, ...].
+
+    Returns:
+        list: The transcript (or None) for each job, in input order. Jobs that failed
+              hold the raised exception instead (ValueError or RequestException).
+    """
+    async with service:
+        return await asyncio.gather(*(service.aget_earnings_transcript(**job) for job in jobs),
+                                    return_exceptions=True)
 
 
 # TESTING
@@ -188,11 +576,11 @@ if __name__ == "__main__":
         try:
             msft_transcript = ninjas_service.get_earnings_transcript(ticker="MSFT", year=2025, quarter=1)
             if msft_transcript:
-                print(f"Date: {msft_transcript['date']}")
-                print(f"Transcript (first 500 chars):\n{msft_transcript['transcript'][:500]}...\n")
-                if msft_transcript['transcript_split']:
+                print(f"Date: {msft_transcript.date}")
+                print(f"Transcript (first 500 chars):\n{msft_transcript.transcript[:500]}...\n")
+                if msft_transcript.transcript_split:
                     print(
-                        f"Transcript Split Detected! First 3 segments:\n{json.dumps(msft_transcript['transcript_split'][:3], indent=2)}\n")
+                        f"Transcript Split Detected! First 3 segments:\n{json.dumps(msft_transcript.transcript_split[:3], indent=2)}\n")
                 else:
                     print("Transcript Split NOT detected (unexpected, but possible for some data points).")
             else:
@@ -206,9 +594,9 @@ if __name__ == "__main__":
         try:
             googl_profile = ninjas_service.get_company_profile_basic(ticker="GOOG")
             if googl_profile:
-                print(f"Company Name: {googl_profile.get('name')}")
-                print(f"Ticker Symbol: {googl_profile.get('symbol')}\n")
-                print(f"Logo URL: {googl_profile.get('logo_url')}\n")
+                print(f"Company Name: {googl_profile.name}")
+                print(f"Ticker Symbol: {googl_profile.symbol}\n")
+                print(f"Logo URL: {googl_profile.logo_url}\n")
             else:
                 print("Failed to retrieve GOOGL company profile (no data returned).")
         except (ValueError, requests.exceptions.RequestException, Exception) as e:
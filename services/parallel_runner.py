@@ -0,0 +1,105 @@
+"""
+Rate-limit aware runner for fanning out many API requests at once.
+Modeled on OpenAI's api_request_parallel_processor.py cookbook script:
+requests are dispatched as soon as both the request and the token budget allow,
+budgets refill continuously, and failed requests are retried with backoff.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+
+async def run(requests: list, max_requests_per_minute: float, max_tokens_per_minute: float,
+              max_attempts: int = 5, retryable_exceptions: tuple = (Exception,)) -> list:
+    """
+    Runs request jobs concurrently while staying under request and token rate limits.
+
+    Args:
+        requests (list): Dictionaries with a "call" (a zero-argument coroutine function
+                         performing the request) and a "token_estimate" (the number of tokens
+                         the request is expected to consume, prompt and completion).
+        max_requests_per_minute (float): The request budget (RPM) to stay under.
+        max_tokens_per_minute (float): The token budget (TPM) to stay under.
+        max_attempts (int): How many times a request is tried before giving up on it.
+        retryable_exceptions (tuple): Exception types worth retrying (rate limits, timeouts...);
+                                      anything else fails the request straight away.
+
+    Returns:
+        list: The result of each request in input order, or the exception
+              it last raised if it could not be completed.
+    """
+    pending = deque(enumerate(requests))
+    retries = []  # (ready_at, index, request)
+    attempts = [0] * len(requests)
+    results = [None] * len(requests)
+    in_flight = set()
+
+    available_request_capacity = max_requests_per_minute
+    available_token_capacity = max_tokens_per_minute
+    last_update_time = time.monotonic()
+    next_request = None
+
+    async def attempt(index: int, request: dict):
+        attempts[index] += 1
+        try:
+            results[index] = await request["call"]()
+        except retryable_exceptions as e:
+            if attempts[index] >= max_attempts:
+                results[index] = e
+                return
+            delay = _retry_after_seconds(e)
+            if delay is None:
+                delay = min(2 ** attempts[index], 60)
+            retries.append((time.monotonic() + delay, index, request))
+        except Exception as e:
+            results[index] = e
+
+    while pending or retries or in_flight or next_request:
+        now = time.monotonic()
+
+        if next_request is None:
+            ready = [retry for retry in retries if retry[0] <= now]
+            if ready:
+                retry = min(ready, key=lambda item: item[0])
+                retries.remove(retry)
+                next_request = retry[1:]
+            elif pending:
+                next_request = pending.popleft()
+
+        # Refill both budgets for the time elapsed, up to one minute's worth
+        elapsed = now - last_update_time
+        available_request_capacity = min(available_request_capacity + max_requests_per_minute * elapsed / 60,
+                                         max_requests_per_minute)
+        available_token_capacity = min(available_token_capacity + max_tokens_per_minute * elapsed / 60,
+                                       max_tokens_per_minute)
+        last_update_time = now
+
+        if next_request is not None:
+            index, request = next_request
+            token_estimate = min(request["token_estimate"], max_tokens_per_minute)
+            if available_request_capacity >= 1 and available_token_capacity >= token_estimate:
+                available_request_capacity -= 1
+                available_token_capacity -= token_estimate
+                task = asyncio.create_task(attempt(index, request))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                next_request = None
+                continue
+
+        # Nothing could be dispatched right now: yield to the in-flight requests
+        await asyncio.sleep(0.001)
+
+    return results
+
+
+def _retry_after_seconds(error: Exception):
+    """
+    Reads the Retry-After header (in seconds) from an HTTP error, if the server sent one.
+    """
+    response = getattr(error, "response", None)
+    retry_after = getattr(response, "headers", {}).get("retry-after")
+    try:
+        return float(retry_after) if retry_after else None
+    except ValueError:
+        return None
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault("EBITA_LLM_CACHE_DIR", tempfile.mkdtemp())
+
+import orjson
+
+from services import chatgpt_service
+from services.chatgpt_service import ChatGPTService
+
+
+class FakeAsyncOpenAI:
+    """Records chat completion requests and answers each with the next canned content."""
+
+    def __init__(self, answers, requests):
+        self.requests = requests
+        self.answers = answers
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **params):
+        self.requests.append(params)
+        content = self.answers(params)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def echo_results(params):
+    """Answers a packed request with one analysis per numbered transcript."""
+    count = params["messages"][1]["content"].count("=== TRANSCRIPT ")
+    return orjson.dumps({"results": [{"id": number, "analysis": {"n": number}} for number in range(1, count + 1)]}).decode()
+
+
+class MultitaskTest(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = []
+        self.service = ChatGPTService("sk-test", model_name="gpt-4o-mini")
+
+    def analyze(self, answers, items, **kwargs):
+        with mock.patch.object(chatgpt_service, "AsyncOpenAI",
+                               lambda api_key: FakeAsyncOpenAI(answers, self.requests)):
+            return self.service.analyze_transcripts_multitask(items, **kwargs)
+
+    def test_packs_shrink_to_fit_the_output_token_limit(self):
+        items = [(f"transcript {index}", "summarize") for index in range(10)]
+        results = self.analyze(echo_results, items, k=10, max_tokens=6000)
+
+        limit = chatgpt_service.MAX_OUTPUT_TOKENS["gpt-4o-mini"]
+        self.assertTrue(all(request["max_tokens"] <= limit for request in self.requests))
+        self.assertEqual(len(self.requests), 5)  # 16384 // 6000 = 2 transcripts per pack
+        self.assertTrue(all(result["success"] for result in results))
+
+    def test_non_object_answers_fail_each_transcript_separately(self):
+        for answer in ('["not", "an", "object"]', '"just text"', '{"results": "none"}'):
+            with self.subTest(answer=answer):
+                results = self.analyze(lambda params: answer, [("a", "p"), ("b", "p")], k=2)
+                self.assertEqual([result["success"] for result in results], [False, False])
+                self.assertIsNot(results[0], results[1])
+
+
+class AnalysisCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = []
+        self.service = ChatGPTService("sk-test", model_name="gpt-4o-mini")
+        self.service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self.create)))
+        self.cache_dir = tempfile.mkdtemp()
+        chatgpt_service._get_analysis_cache.cache_clear()
+        self.addCleanup(chatgpt_service._get_analysis_cache.cache_clear)
+        patcher = mock.patch.object(chatgpt_service, "ANALYSIS_CACHE_DIR", self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create(self, **params):
+        self.requests.append(params)
+        content = orjson.dumps({"max_tokens": params["max_tokens"]}).decode()
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def test_cache_is_opt_in(self):
+        self.service.analyze_transcript("text", "summarize")
+        self.service.analyze_transcript("text", "summarize")
+        self.assertEqual(len(self.requests), 2)
+        self.assertFalse(os.listdir(self.cache_dir))
+
+    def test_cache_key_includes_max_tokens(self):
+        short = self.service.analyze_transcript("text", "summarize", max_tokens=100, use_cache=True)
+        long = self.service.analyze_transcript("text", "summarize", max_tokens=4000, use_cache=True)
+        again = self.service.analyze_transcript("text", "summarize", max_tokens=100, use_cache=True)
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(short["analysis"], {"max_tokens": 100})
+        self.assertEqual(long["analysis"], {"max_tokens": 4000})
+        self.assertEqual(again, short)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+from flask import Flask
+from sqlalchemy import text
+
+from data.data_manager import DataManager
+from data.data_models import db, Company
+
+
+class BulkInsertTest(unittest.TestCase):
+    """Bulk inserts whose rows do not all set the same optional columns."""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.data_manager = DataManager(db)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def test_add_companies_bulk_mixes_sparse_and_full_rows(self):
+        rows = [
+            {"ticker_symbol": "MSFT", "company_name": "Microsoft", "industry": "Software"},
+            {"ticker_symbol": "AAPL", "company_name": "Apple Inc"},
+            {"ticker_symbol": "NVDA", "company_name": "NVIDIA", "industry": "Semiconductors",
+             "sector": "Technology", "exchange": "NASDAQ", "logo_url": "https://example.com/nvda.png"},
+        ]
+        self.assertEqual(self.data_manager.add_companies_bulk(rows), 3)
+
+        apple = db.session.get(Company, "AAPL")
+        self.assertIsNone(apple.industry)
+        self.assertIsNotNone(apple.last_updated)
+        self.assertEqual(db.session.get(Company, "MSFT").industry, "Software")
+        self.assertEqual(db.session.get(Company, "NVDA").exchange, "NASDAQ")
+        # Column defaults are naive UTC, like every other stored timestamp
+        self.assertIsNone(apple.last_updated.tzinfo)
+        self.assertLess(abs(apple.last_updated - datetime.now(timezone.utc).replace(tzinfo=None)), timedelta(minutes=1))
+
+    def test_add_transcripts_bulk_mixes_sparse_and_full_rows(self):
+        self.data_manager.add_companies_bulk([{"ticker_symbol": "MSFT", "company_name": "Microsoft"}])
+        rows = [
+            {"ticker_symbol": "MSFT", "fiscal_year": 2024, "fiscal_quarter": 1, "call_date": date(2024, 1, 30),
+             "raw_text": "Q1 call",
+             "speaker_segments": [{"speaker": "CEO", "text": "hi"}], "source_url": "https://example.com/q1"},
+            {"ticker_symbol": "MSFT", "fiscal_year": 2024, "fiscal_quarter": 2, "call_date": date(2024, 4, 25),
+             "raw_text": "Q2 call"},
+        ]
+        self.assertEqual(self.data_manager.add_transcripts_bulk(rows), 2)
+
+        second = self.data_manager.get_transcript_by_details("MSFT", 2024, 2)
+        self.assertIsNone(second.source_url)
+        self.assertIsNone(second.speaker_segments)
+
+
+
+class CompanyCacheTest(unittest.TestCase):
+    """The company lookup cache, which other processes cannot invalidate."""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.data_manager = DataManager(db)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def test_unknown_ticker_is_not_cached(self):
+        self.assertIsNone(self.data_manager.get_company_by_ticker("ZZZZ"))
+        # Added behind the cache's back, as another worker would
+        db.session.execute(text("INSERT INTO companies (ticker_symbol, company_name) VALUES ('ZZZZ', 'Zed')"))
+        db.session.commit()
+        self.assertEqual(self.data_manager.get_company_by_ticker("ZZZZ").company_name, "Zed")
+
+
+    def test_search_follows_inserts_updates_and_deletes_across_vacuum(self):
+        self.data_manager.add_companies_bulk([
+            {"ticker_symbol": "AAPL", "company_name": "Apple Inc", "industry": "Hardware"},
+            {"ticker_symbol": "MSFT", "company_name": "Microsoft", "industry": "Software"},
+            {"ticker_symbol": "NVDA", "company_name": "NVIDIA", "industry": "Semiconductors"},
+        ])
+        db.session.execute(text("DELETE FROM companies WHERE ticker_symbol = 'AAPL'"))
+        db.session.execute(text("UPDATE companies SET industry = 'Cloud' WHERE ticker_symbol = 'MSFT'"))
+        db.session.commit()
+        # VACUUM may renumber the implicit rowids of a table with a TEXT primary key
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM"))
+
+        def search(query):
+            return [company.ticker_symbol for company in self.data_manager.get_all_companies(query)]
+
+        self.assertEqual(search("apple"), [])
+        self.assertEqual(search("micro"), ["MSFT"])
+        self.assertEqual(search("cloud"), ["MSFT"])
+        self.assertEqual(search("software"), [])
+        self.assertEqual(search("semi"), ["NVDA"])
+
+    def test_create_all_refills_the_search_index(self):
+        self.data_manager.add_companies_bulk([{"ticker_symbol": "MSFT", "company_name": "Microsoft"}])
+        db.create_all()
+        self.assertEqual([company.ticker_symbol for company in self.data_manager.get_all_companies("micro")], ["MSFT"])
+
+
+if __name__ == '__main__':
+    unittest.main()
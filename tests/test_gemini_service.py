@@ -0,0 +1,97 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ.setdefault("EBITA_LLM_CACHE_DIR", tempfile.mkdtemp())
+
+import httpx
+import orjson
+
+from services.gemini_service import GeminiService
+
+
+def answer(handled_requests):
+    """MockTransport handler recording each request and answering with a JSON generation."""
+    def handler(request):
+        handled_requests.append(request)
+        text = orjson.loads(request.content)["contents"][0]["parts"][0]["text"]
+        body = {"candidates": [{"content": {"parts": [{"text": orjson.dumps({"echo": text}).decode()}]}}]}
+        return httpx.Response(200, json=body)
+    return handler
+
+
+class AsyncRequestUrlTest(unittest.TestCase):
+    """The async paths must post to the same models/<model>:generateContent URL as the sync one."""
+
+    def setUp(self):
+        self.requests = []
+        self.service = GeminiService("test-key", default_model="gemini-2.5-flash")
+
+    def mock_transport(self):
+        """Routes every AsyncClient the service builds through a MockTransport."""
+        transport = httpx.MockTransport(answer(self.requests))
+        real_client = httpx.AsyncClient
+        return mock.patch("services.gemini_service.httpx.AsyncClient",
+                          lambda **options: real_client(transport=transport, **options))
+
+    def test_agenerate_content_posts_to_the_model_url(self):
+        async def generate():
+            async with self.service:
+                return await self.service.agenerate_content("hello")
+
+        with self.mock_transport():
+            self.assertEqual(asyncio.run(generate()), {"echo": "hello"})
+        self.assertEqual(str(self.requests[0].url),
+                         "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent")
+
+    def test_model_override_is_kept_in_the_url(self):
+        async def generate():
+            async with httpx.AsyncClient(base_url=self.service.base_url,
+                                         transport=httpx.MockTransport(answer(self.requests))) as client:
+                return await self.service._make_request_async(client, "gemini-2.5-pro", "hi")
+
+        asyncio.run(generate())
+        self.assertEqual(self.requests[0].url.path, "/v1beta/models/gemini-2.5-pro:generateContent")
+
+    def test_generate_many_posts_every_prompt_to_the_model_url(self):
+        with self.mock_transport():
+            results = self.service.generate_many(["a", "b"], model_name="gemini-2.5-pro")
+
+        self.assertEqual(results, [{"echo": "a"}, {"echo": "b"}])
+        self.assertEqual({str(request.url) for request in self.requests},
+                         {"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-pro:generateContent"})
+
+
+
+class SharedServiceEventLoopTest(unittest.TestCase):
+    """The cached service is reused across asyncio.run calls, each with its own event loop."""
+
+    def test_agenerate_content_works_across_event_loops(self):
+        requests = []
+        real_client = httpx.AsyncClient
+        service = GeminiService("test-key")
+
+        def loop_bound_client(**options):
+            # Like a real connection pool, the client only works on the loop it was created on
+            created_on = asyncio.get_running_loop()
+            handler = answer(requests)
+
+            async def handle(request):
+                if asyncio.get_running_loop() is not created_on:
+                    raise RuntimeError("Event loop is closed")
+                return handler(request)
+            return real_client(transport=httpx.MockTransport(handle), **options)
+
+        with mock.patch("services.gemini_service.httpx.AsyncClient", loop_bound_client):
+            # Without async with, so the first loop's client is left behind when its loop closes
+            first = asyncio.run(service.agenerate_content("one"))
+            second = asyncio.run(service.agenerate_content("two"))
+
+        self.assertEqual((first, second), ({"echo": "one"}, {"echo": "two"}))
+        self.assertEqual(len(requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
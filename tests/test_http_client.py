@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services import http_client
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers each GET with the next (status, headers) pair of the server's script."""
+
+    def do_GET(self):
+        status, headers = self.server.script.pop(0)
+        self.server.hits += 1
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SyncRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+        self.server.hits = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+        # Same retry policy as the shared session, mounted for the plain-HTTP test server
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(max_retries=http_client.get_session().adapters["https://"].max_retries))
+        self.addCleanup(self.session.close)
+
+    def test_long_retry_after_returns_the_response_at_once(self):
+        self.server.script = [(503, {"Retry-After": "120"}), (200, {})]
+        with mock.patch("urllib3.util.retry.time.sleep") as sleep:
+            response = self.session.get(self.url, timeout=5)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits, 1)
+        sleep.assert_not_called()
+
+    def test_retries_take_a_token_from_the_host_limiter(self):
+        self.server.script = [(503, {"Retry-After": "0"}), (429, {"Retry-After": "0"}), (200, {})]
+        limiter = mock.Mock(spec=http_client.TokenBucket)
+        with mock.patch.dict(http_client._host_rate_limiters, {"127.0.0.1": limiter}):
+            response = self.session.get(self.url, timeout=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits, 3)
+        self.assertEqual(limiter.acquire.call_count, 2)
+
+
+class FakeClock:
+    """Stands in for the time module; sleeping advances the clock instead of waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        # Swapped into http_client only, so the event loop keeps its real clock
+        self.clock = FakeClock()
+        self.async_sleeps = []
+
+        async def async_sleep(seconds):
+            self.async_sleeps.append(seconds)
+            self.clock.now += seconds
+
+        for name, replacement in (("time", self.clock), ("asyncio", SimpleNamespace(sleep=async_sleep))):
+            patcher = mock.patch.object(http_client, name, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_burst_up_to_capacity_does_not_wait(self):
+        bucket = http_client.TokenBucket(5)
+        for _ in range(5):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+        bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [0.2])
+
+    def test_tokens_refill_at_the_configured_rate(self):
+        bucket = http_client.TokenBucket(60, period=60)
+        for _ in range(60):
+            bucket.acquire()
+
+        self.clock.now += 3
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+        bucket.acquire()
+        self.assertAlmostEqual(self.clock.sleeps[0], 1.0)
+
+    def test_refill_stops_at_capacity(self):
+        bucket = http_client.TokenBucket(2)
+        self.clock.now += 60
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+    def test_async_acquire_waits_without_blocking(self):
+        bucket = http_client.TokenBucket(2)
+
+        async def acquire_many():
+            for _ in range(4):
+                await bucket.acquire_async()
+
+        asyncio.run(acquire_many())
+        self.assertEqual(self.async_sleeps, [0.5, 0.5])
+        self.assertEqual(self.clock.sleeps, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
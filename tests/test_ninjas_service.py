@@ -0,0 +1,223 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date
+from unittest import mock
+
+import httpx
+import orjson
+import requests
+from requests.adapters import BaseAdapter
+
+from services import ninjas_service
+from services.ninjas_service import NinjasService
+
+TODAY = date.today()
+CURRENT_QUARTER = (TODAY.year, (TODAY.month - 1) // 3 + 1)
+PAST_QUARTER = (TODAY.year - 1, 1)
+TRANSCRIPT_BODY = orjson.dumps([{"date": "2024-01-30", "transcript": "text"}])
+
+
+class ScriptedAdapter(BaseAdapter):
+    """requests transport answering each request with the next status code, once `release` is set."""
+
+    def __init__(self, statuses):
+        super().__init__()
+        self.statuses = statuses
+        self.requests = []
+        self.release = threading.Event()
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        self.release.wait(5)
+        response = requests.Response()
+        response.status_code = self.statuses.pop(0)
+        response._content = TRANSCRIPT_BODY if response.status_code == 200 else b'{"error": "bad request"}'
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+class CountingLock:
+    """Lock wrapper counting how many times it has been released."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._released = threading.Semaphore(0)
+
+    def __enter__(self):
+        self._lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+        self._released.release()
+
+    def wait_for_releases(self, count):
+        for _ in range(count):
+            self._released.acquire(timeout=5)
+
+
+class CachedServiceTest(unittest.TestCase):
+    """Runs each test against an empty response cache in a temporary directory."""
+
+    def setUp(self):
+        self.requests = []
+        self.service = NinjasService("test-key")
+        ninjas_service._get_response_cache.cache_clear()
+        self.addCleanup(ninjas_service._get_response_cache.cache_clear)
+        patcher = mock.patch.object(ninjas_service, "RESPONSE_CACHE_DIR", tempfile.mkdtemp())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fetch_transcript(self, handler, year, quarter):
+        """Fetches a transcript on the async path, answering its requests with handler."""
+        async def fetch():
+            self.service._async_client = httpx.AsyncClient(base_url=self.service.base_url,
+                                                           transport=httpx.MockTransport(self.record(handler)))
+            async with self.service:
+                return await self.service.aget_earnings_transcript("AAPL", year, quarter)
+
+        return asyncio.run(fetch())
+
+    def record(self, handler):
+        def recording_handler(request):
+            self.requests.append(request)
+            return handler(request)
+        return recording_handler
+
+    def store_stale(self, year, quarter, text, etag):
+        """Caches a transcript whose freshness has run out but which can be revalidated."""
+        params = self.service._transcript_params("AAPL", year, quarter)
+        cache_key = self.service._cache_key("earningstranscript", params)
+        entry = {"body": {"date": "2024-01-30", "transcript": text}, "etag": etag, "last_modified": None,
+                 "fresh_until": time.time() - 1}
+        ninjas_service._get_response_cache().set(cache_key, entry)
+        return cache_key
+
+
+class RevalidationTest(CachedServiceTest):
+
+    def test_not_modified_serves_the_cached_body_and_renews_it(self):
+        cache_key = self.store_stale(*CURRENT_QUARTER, text="cached", etag='"v1"')
+
+        transcript = self.fetch_transcript(lambda request: httpx.Response(304), *CURRENT_QUARTER)
+
+        self.assertEqual(self.requests[0].headers["If-None-Match"], '"v1"')
+        self.assertEqual(transcript.transcript, "cached")
+        entry = ninjas_service._get_response_cache().get(cache_key)
+        self.assertGreater(entry["fresh_until"], time.time())
+
+    def test_changed_resource_replaces_the_cached_entry(self):
+        cache_key = self.store_stale(*CURRENT_QUARTER, text="cached", etag='"v1"')
+        body = orjson.dumps([{"date": "2024-01-30", "transcript": "updated"}])
+
+        transcript = self.fetch_transcript(lambda request: httpx.Response(200, content=body, headers={"ETag": '"v2"'}),
+                                           *CURRENT_QUARTER)
+
+        self.assertEqual(transcript.transcript, "updated")
+        entry = ninjas_service._get_response_cache().get(cache_key)
+        self.assertEqual(entry["body"]["transcript"], "updated")
+        self.assertEqual(entry["etag"], '"v2"')
+
+    def test_past_quarter_is_never_revalidated(self):
+        body = orjson.dumps([{"date": "2024-01-30", "transcript": "final"}])
+        handler = lambda request: httpx.Response(200, content=body, headers={"ETag": '"v1"'})
+
+        first = self.fetch_transcript(handler, *PAST_QUARTER)
+        second = self.fetch_transcript(handler, *PAST_QUARTER)
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(second, first)
+
+
+class SingleFlightTest(CachedServiceTest):
+
+    def fetch_concurrently(self, adapter):
+        """Runs two identical synchronous fetches while the first one's request is held by the adapter."""
+        session = requests.Session()
+        session.mount("https://", adapter)
+        self.service.session = session
+        self.service._inflight_lock = lock = CountingLock()
+        outcomes = [None, None]
+
+        def fetch(index):
+            try:
+                outcomes[index] = self.service.get_earnings_transcript("AAPL", *CURRENT_QUARTER)
+            except Exception as e:
+                outcomes[index] = e
+
+        threads = [threading.Thread(target=fetch, args=(index,)) for index in range(2)]
+        threads[0].start()
+        lock.wait_for_releases(1)  # the leader registered its request
+        threads[1].start()
+        lock.wait_for_releases(1)  # the follower found it
+        adapter.release.set()
+        for thread in threads:
+            thread.join(5)
+        return outcomes
+
+    def test_concurrent_callers_share_one_request(self):
+        adapter = ScriptedAdapter([200])
+        first, second = self.fetch_concurrently(adapter)
+
+        self.assertEqual(len(adapter.requests), 1)
+        self.assertEqual(first.transcript, "text")
+        self.assertEqual(second, first)
+        self.assertEqual(self.service._inflight, {})
+
+    def test_failing_leader_does_not_poison_later_calls(self):
+        adapter = ScriptedAdapter([400, 200])
+        with self.assertLogs(ninjas_service.logger, "ERROR"):
+            first, second = self.fetch_concurrently(adapter)
+
+        self.assertIsInstance(first, ValueError)
+        self.assertIs(second, first)
+        self.assertEqual(self.service._inflight, {})
+        self.assertEqual(self.service.get_earnings_transcript("AAPL", *CURRENT_QUARTER).transcript, "text")
+        self.assertEqual(len(adapter.requests), 2)
+
+    def fetch_concurrently_async(self, statuses, callers=2):
+        """Gathers identical async fetches, answering the requests with the given status codes."""
+        async def handler(request):
+            self.requests.append(request)
+            await asyncio.sleep(0)
+            status = statuses.pop(0)
+            return httpx.Response(status, content=TRANSCRIPT_BODY if status == 200 else b'{"error": "bad request"}')
+
+        async def fetch():
+            self.service._async_client = httpx.AsyncClient(base_url=self.service.base_url,
+                                                           transport=httpx.MockTransport(handler))
+            async with self.service:
+                return await asyncio.gather(
+                    *(self.service.aget_earnings_transcript("AAPL", *CURRENT_QUARTER) for _ in range(callers)),
+                    return_exceptions=True)
+
+        return asyncio.run(fetch())
+
+    def test_concurrent_async_callers_share_one_request(self):
+        first, second = self.fetch_concurrently_async([200])
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(first.transcript, "text")
+        self.assertEqual(second, first)
+        self.assertEqual(self.service._ainflight, {})
+
+    def test_failing_async_leader_does_not_poison_later_calls(self):
+        with self.assertLogs(ninjas_service.logger, "ERROR"):
+            first, second = self.fetch_concurrently_async([400])
+
+        self.assertIsInstance(first, ValueError)
+        self.assertIs(second, first)
+        self.assertEqual(self.service._ainflight, {})
+        [retry] = self.fetch_concurrently_async([200], callers=1)
+        self.assertEqual(retry.transcript, "text")
+        self.assertEqual(len(self.requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
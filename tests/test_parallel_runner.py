@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+
+from services import parallel_runner
+
+
+class RetryableStatusError(Exception):
+    """Stands in for an SDK error carrying the HTTP response (status and headers)."""
+
+    def __init__(self, status_code, retry_after="0"):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code, "headers": {"retry-after": retry_after}})()
+
+
+class ParallelRunnerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def run_requests(self, requests, **kwargs):
+        options = {"max_requests_per_minute": 6000, "max_tokens_per_minute": 1_000_000}
+        options.update(kwargs)
+        return await asyncio.wait_for(parallel_runner.run(requests, **options), timeout=5)
+
+    async def test_retries_a_retryable_status_until_it_succeeds(self):
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise RetryableStatusError(429)
+            return "done"
+
+        results = await self.run_requests([{"call": flaky, "token_estimate": 10}],
+                                          retryable_exceptions=(RetryableStatusError,))
+        self.assertEqual(results, ["done"])
+        self.assertEqual(len(calls), 3)
+
+    async def test_gives_up_after_max_attempts(self):
+        calls = []
+
+        async def always_limited():
+            calls.append(1)
+            raise RetryableStatusError(503)
+
+        results = await self.run_requests([{"call": always_limited, "token_estimate": 10}], max_attempts=3,
+                                          retryable_exceptions=(RetryableStatusError,))
+        self.assertIsInstance(results[0], RetryableStatusError)
+        self.assertEqual(len(calls), 3)
+
+    async def test_does_not_retry_other_errors(self):
+        calls = []
+
+        async def broken():
+            calls.append(1)
+            raise KeyError("bad payload")
+
+        results = await self.run_requests([{"call": broken, "token_estimate": 10}],
+                                          retryable_exceptions=(RetryableStatusError,))
+        self.assertIsInstance(results[0], KeyError)
+        self.assertEqual(len(calls), 1)
+
+    async def test_results_keep_input_order(self):
+        def request(value, delay):
+            async def call():
+                await asyncio.sleep(delay)
+                return value
+            return {"call": call, "token_estimate": 1}
+
+        # Later requests finish first
+        results = await self.run_requests([request(index, 0.05 - index * 0.01) for index in range(5)])
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,8 @@
+"""
+WSGI entry point of the My EBITA app, for production servers:
+gunicorn -w $((2*$(nproc)+1)) -k gthread --threads 8 --worker-tmp-dir /dev/shm wsgi:application
+"""
+
+from app import app
+
+application = app